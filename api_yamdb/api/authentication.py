@@ -0,0 +1,110 @@
+"""
+JWT-аутентификация с кэшем пользователей в памяти процесса.
+
+JWTAuthentication читает пользователя из БД на каждый запрос. Здесь
+прочитанные строки хранятся в ограниченном LRU-кэше со сроком жизни
+вместе с версией пользователя из кэша Django. Сигналы модели User
+(api/signals.py) меняют версию при любом изменении пользователя, и
+процесс перечитывает его из БД, поэтому роль и активность в проверках
+прав не устаревают. Проверка версии - одно чтение из кэша Django, без
+запросов к БД.
+
+Другие процессы видят новую версию, только если кэш Django у них общий
+(Memcached, Redis). С LocMemCache, который у каждого процесса свой,
+изменение доходит до них не раньше USER_CACHE_TIMEOUT секунд, поэтому
+такой бэкенд годится лишь для одного процесса; `manage.py check --deploy`
+сообщает об этом ошибкой api.E001.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """LRU-кэш записей о пользователях со сроком жизни."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires < time.monotonic():
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+            return values
+
+    def set(self, user_id, values):
+        with self.lock:
+            self.entries[user_id] = (time.monotonic() + self.timeout, values)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TIMEOUT)
+
+USER_VERSION_KEY = 'api:user:{}'
+
+
+def get_user_version(user_id):
+    """Версия пользователя; вытесненная из кэша создается заново
+    и не совпадает с прежней."""
+    key = USER_VERSION_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_user_version(user_id):
+    """Устаревшими становятся записи пользователя во всех процессах."""
+    cache.delete(USER_VERSION_KEY.format(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, берущая пользователя из user_cache. Каждый запрос
+    получает свой экземпляр модели: общий объект между потоками
+    и запросами не разделяется.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        fields = [field.attname for field in
+                  self.user_model._meta.concrete_fields]
+        # Версия читается до БД: строка, прочитанная до изменения,
+        # сохранится под прежней версией и не будет использована.
+        version = get_user_version(user_id)
+        entry = user_cache.get(user_id)
+        if entry is not None and entry[0] == version:
+            return self.user_model.from_db(None, fields, entry[1])
+        user = super().get_user(validated_token)
+        user_cache.set(
+            user_id,
+            (version, tuple(getattr(user, field) for field in fields)))
+        return user
@@ -0,0 +1,123 @@
+"""Кэш ответов API с инвалидацией по версиям моделей.
+
+Версия - метка времени в наносекундах последней записи в таблицу модели
+или в ее часть (scope, например отзывы одного произведения). Версии
+зависимостей входят в ключ кэша и в ETag, поэтому запись делает
+устаревшие ответы недостижимыми, а не удаляет их.
+
+Версии хранятся в БД (CacheVersion): запись в любом процессе видна всем
+остальным, даже если кэш ответов у каждого процесса свой. Ключ кэша
+и ETag одного запроса строятся из одних и тех же прочитанных версий.
+"""
+import hashlib
+import time
+
+from django.db import transaction
+from django.db.models import BigIntegerField, F, Subquery, Value
+from django.db.models.functions import Greatest
+
+from reviews.models import CacheVersion
+
+RESPONSE_KEY = 'api:response:{}'
+# Версия хранимых счетчиков, пересчитанных разом (rebuild_aggregates).
+AGGREGATES = 'aggregates'
+# Версий в одном UPDATE: число параметров запроса ограничено.
+STORE_BATCH_SIZE = 500
+# Атрибут соединения с версиями, отмеченными в текущей транзакции.
+PENDING_ATTR = 'api_pending_versions'
+
+
+def version_name(item):
+    """Имя версии: модель целиком или строка, построенная scope()."""
+    if isinstance(item, str):
+        return item
+    return item._meta.label_lower
+
+
+def scope(model, field, value):
+    """Версия объектов модели с field=value."""
+    return f'{version_name(model)}:{field}={value}'
+
+
+def stored_versions(items, anchor=None):
+    """
+    Версии из БД в порядке перечисления; версия без записей - 0. С anchor
+    (queryset объекта ресурса) они читаются тем же запросом, что находит
+    объект, а если его нет, возвращается None.
+    """
+    names = [version_name(item) for item in items]
+    if anchor is None:
+        stored = dict(CacheVersion.objects.filter(
+            name__in=names).values_list('name', 'version'))
+        return tuple(stored.get(name, 0) for name in names)
+    columns = {
+        f'version_{idx}': Subquery(
+            CacheVersion.objects.filter(name=name).values('version')[:1])
+        for idx, name in enumerate(names)
+    }
+    row = anchor.order_by().prefetch_related(None).annotate(
+        **columns).values_list(*columns)[:1]
+    row = next(iter(row), None)
+    if row is None:
+        return None
+    return tuple(version or 0 for version in row)
+
+
+def store_versions(names, now):
+    """Увеличивает версии в БД: не меньше now и больше прежних."""
+    for start in range(0, len(names), STORE_BATCH_SIZE):
+        batch = names[start:start + STORE_BATCH_SIZE]
+        updated = CacheVersion.objects.filter(name__in=batch).update(
+            version=Greatest(F('version') + 1,
+                             Value(now, output_field=BigIntegerField())))
+        if updated < len(batch):
+            # Существующие строки уже обновлены, вставляются недостающие.
+            CacheVersion.objects.bulk_create(
+                [CacheVersion(name=name, version=now) for name in batch],
+                ignore_conflicts=True)
+
+
+class PendingVersions(set):
+    """Имена версий, отмеченных в транзакции; записываются одним разом
+    после ее фиксации."""
+
+    def __call__(self):
+        store_versions(sorted(self), time.time_ns())
+
+
+def bump_versions(*items):
+    """
+    Отмечает запись в таблицы моделей или их части после фиксации
+    транзакции: иначе параллельный запрос мог бы сохранить в кэше еще
+    старые данные под новой версией. Все отметки транзакции (например,
+    каскадного удаления) собираются в одну запись версий.
+    """
+    names = {version_name(item) for item in items}
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        store_versions(sorted(names), time.time_ns())
+        return
+    pending = getattr(connection, PENDING_ATTR, None)
+    # Откат транзакции или точки сохранения убирает обработчик из
+    # run_on_commit: тогда отметки собираются заново.
+    if pending is None or not any(
+            func is pending for _, func in connection.run_on_commit):
+        pending = PendingVersions()
+        setattr(connection, PENDING_ATTR, pending)
+        transaction.on_commit(pending)
+    pending.update(names)
+
+
+def request_fingerprint(request, *parts):
+    """Хэш хоста, пути и нормализованных параметров запроса."""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    raw = repr((parts, request.get_host(), request.path, params))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def response_cache_key(request, prefix, versions):
+    return RESPONSE_KEY.format(request_fingerprint(request, prefix, versions))
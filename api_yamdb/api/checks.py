@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Бэкенды кэша, данные которых видны только своему процессу.
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии пользователей (api.authentication) должны быть общими для
+    всех процессов сервера."""
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        'Кэш по умолчанию виден только своему процессу: изменения '
+        'пользователей (роль, активность) не дойдут до других процессов '
+        'до истечения USER_CACHE_TIMEOUT.',
+        hint='Задайте общий кэш через CACHE_BACKEND и CACHE_LOCATION, '
+             'например PyMemcacheCache.',
+        id='api.E001',
+    )]
@@ -0,0 +1,94 @@
+"""
+Сериализация страниц списков напрямую из строк .values().
+
+Повторяет формат TitleRetriveSerializer, ReviewSerializer и
+CommentSerializer, но без обхода полей DRF для каждого объекта. Любое
+изменение полей тех сериализаторов нужно отразить здесь: совпадение
+вывода проверяет tests/test_15_fast_serializers.py.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from reviews.models import TitleGenre
+
+# Тот же формат даты, что у полей DateTimeField в сериализаторах.
+format_datetime = serializers.DateTimeField().to_representation
+
+
+class ValuesSerializer:
+    """Базовый класс: values() и построение словарей по строкам."""
+    fields = ()
+
+    def prepare(self, queryset):
+        return queryset.prefetch_related(None).values(*self.fields)
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    fields = ('id', 'name', 'year', 'score_sum', 'review_count',
+              'description', 'category__name', 'category__slug')
+
+    def serialize(self, rows):
+        rows = list(rows)
+        self.genres = defaultdict(list)
+        links = TitleGenre.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).order_by('genre__name').values_list(
+            'title_id', 'genre__name', 'genre__slug')
+        for title_id, name, slug in links:
+            self.genres[title_id].append({'name': name, 'slug': slug})
+        return super().serialize(rows)
+
+    def to_representation(self, row):
+        category = None
+        if row['category__slug'] is not None:
+            category = {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        rating = None
+        if row['review_count']:
+            rating = int(row['score_sum'] / row['review_count'])
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': rating,
+            'review_count': row['review_count'],
+            'description': row['description'],
+            'genre': self.genres[row['id']],
+            'category': category,
+        }
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    fields = ('author__username', 'id', 'pub_date', 'text', 'score',
+              'comment_count')
+
+    def to_representation(self, row):
+        return {
+            'author': row['author__username'],
+            'id': row['id'],
+            'pub_date': format_datetime(row['pub_date']),
+            'text': row['text'],
+            'score': row['score'],
+            'comment_count': row['comment_count'],
+        }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    fields = ('text', 'id', 'pub_date', 'author__username')
+
+    def to_representation(self, row):
+        return {
+            'text': row['text'],
+            'id': row['id'],
+            'pub_date': format_datetime(row['pub_date']),
+            'author': row['author__username'],
+        }
@@ -1,19 +1,116 @@
+import re
+from functools import lru_cache
+
+from django.db import connections
+from django.db.models import Exists, OuterRef, Q
 from django_filters import rest_framework as filters
 
-from reviews.models import Title
+from reviews.models import Category, Title, TitleGenre
+from users.models import User
+
+TITLE_FTS_TABLE = 'reviews_title_fts'
+SEARCH_MAX_TERMS = 10
+
+
+def fts_query(value):
+    """Запрос FTS5: все слова обязательны, каждое ищется как префикс."""
+    terms = re.findall(r'\w+', value)[:SEARCH_MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+@lru_cache(maxsize=None)
+def has_title_fts(alias):
+    connection = connections[alias]
+    return (connection.vendor == 'sqlite'
+            and TITLE_FTS_TABLE in connection.introspection.table_names())
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Список значений через запятую: ?genre=drama,comedy."""
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')),
+        method='filter_genre_match')
+    category__icontains = filters.CharFilter(
         field_name='category__slug',
         lookup_expr='icontains')
-    genre = filters.CharFilter(
+    genre__icontains = filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='icontains')
+        lookup_expr='icontains',
+        distinct=True)
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='icontains')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_category(self, queryset, name, slugs):
+        return queryset.filter(Exists(Category.objects.filter(
+            pk=OuterRef('category_id'), slug__in=slugs)))
+
+    def filter_genre(self, queryset, name, slugs):
+        """Произведения хотя бы с одним (или, при genre_match=all, со
+        всеми) из жанров. EXISTS вместо JOIN не размножает строки."""
+        links = TitleGenre.objects.filter(title=OuterRef('pk'))
+        if self.form.cleaned_data.get('genre_match') != 'all':
+            return queryset.filter(Exists(links.filter(genre__slug__in=slugs)))
+        for slug in set(slugs):
+            queryset = queryset.filter(Exists(links.filter(genre__slug=slug)))
+        return queryset
+
+    def filter_genre_match(self, queryset, name, value):
+        # Учитывается в filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию с ранжированием."""
+        query = fts_query(value)
+        if not query:
+            return queryset
+        if not has_title_fts(queryset.db):
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value))
+        # Соединение с таблицей FTS5 вместо коррелированного подзапроса:
+        # rank вычисляется один раз на совпадение, а не на каждую строку.
+        return queryset.extra(
+            tables=[TITLE_FTS_TABLE],
+            where=[f'{TITLE_FTS_TABLE} MATCH %s',
+                   f'{TITLE_FTS_TABLE}.rowid = {Title._meta.db_table}.id'],
+            params=[query],
+            order_by=[f'{TITLE_FTS_TABLE}.rank', 'id'],
+        )
+
+
+def prefix_range(prefix):
+    """Границы строк с данным префиксом: [prefix, следующая строка)."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class UserFilter(filters.FilterSet):
+    """
+    ?username= - поиск по началу username без учета регистра,
+    ?email= - пользователь с данным email.
+    Префикс ищется диапазоном по индексу username_lower: LIKE в SQLite
+    индекс не использует.
+    """
+    prefix_ordering = ('-username_lower', '-username')
+
+    username = filters.CharFilter(method='filter_username')
+    email = filters.CharFilter(field_name='email')
+
+    class Meta:
+        model = User
+        fields = ('username', 'email')
+
+    def filter_username(self, queryset, name, value):
+        start, end = prefix_range(value.lower())
+        return queryset.filter(
+            username_lower__gte=start, username_lower__lt=end
+        ).order_by(*self.prefix_ordering)
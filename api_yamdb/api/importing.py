@@ -0,0 +1,354 @@
+"""
+Импорт CSV-файлов в БД.
+
+Файлы упорядочиваются по графу внешних ключей моделей. Разбор строк и
+проверку значений (CPU) выполняют процессы пула порциями по batch_size
+строк, а вставляет их один процесс - в порядке зависимостей. Пока
+вставляется одна порция, следующие уже разбираются, в том числе порции
+следующих файлов.
+
+Каждая порция фиксируется в своей транзакции вместе с позицией файла в
+ImportCheckpoint (смещение в байтах и число строк), поэтому прерванный
+импорт продолжается с последней зафиксированной порции (resume=True).
+Внешние ключи проверяются при фиксации порции: в SQLite и PostgreSQL они
+отложенные.
+
+Вторичные индексы (Meta.indexes и индексы внешних ключей) на время
+загрузки удаляются и строятся заново одним проходом по каждой таблице,
+а не поддерживаются построчно. Первичный ключ и ограничения уникальности
+остаются: по ним проверяются конфликты строк.
+"""
+import csv
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import groupby, islice
+
+import django
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Index
+
+from reviews.models import (Category, Comment, Genre, ImportCheckpoint, Review,
+                            Title, TitleGenre)
+from users.models import User
+
+MODELS_CSV = {
+    User: 'users.csv',
+    Category: 'category.csv',
+    Genre: 'genre.csv',
+    Title: 'titles.csv',
+    Review: 'review.csv',
+    Comment: 'comments.csv',
+    TitleGenre: 'genre_title.csv',
+}
+
+fields_to_replace = {
+    MODELS_CSV[Title]: ('category_id', 'category'),
+    MODELS_CSV[Review]: ('author_id', 'author'),
+    MODELS_CSV[Comment]: ('author_id', 'author'),
+}
+
+ON_CONFLICT = ('error', 'skip', 'update')
+
+
+class ImportRowError(Exception):
+    """Строка CSV-файла не соответствует полям модели."""
+
+
+class CheckpointError(Exception):
+    """Сохраненная позиция не подходит к файлу."""
+
+
+def dependency_order(models):
+    """Модели так, что каждая идет после моделей, на которые ссылается;
+    независимые сохраняют исходный порядок."""
+    dependencies = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    ordered = []
+    while dependencies:
+        ready = [model for model, required in dependencies.items()
+                 if required.issubset(ordered)]
+        if not ready:
+            raise ValueError(
+                f'Циклические ссылки между моделями: {list(dependencies)}')
+        for model in ready:
+            ordered.append(model)
+            del dependencies[model]
+    return ordered
+
+
+def chunks(rows, size):
+    rows = iter(rows)
+    chunk = list(islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, size))
+
+
+class OffsetLines:
+    """Строки двоичного файла как текст; offset - позиция после последней
+    выданной строки. csv.reader берет строки по одной, поэтому после
+    каждой записи offset указывает ровно на ее конец."""
+
+    def __init__(self, file):
+        self.file = file
+        self.offset = file.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.file)
+        self.offset += len(line)
+        return line.decode('utf-8')
+
+
+def read_chunks(model, csv_file, csv_file_path, batch_size, offset=0,
+                start=1):
+    """
+    Задачи разбора файла: порции по batch_size строк с позицией конца
+    порции. offset и start - позиция и номер первой строки при
+    продолжении импорта. Файл без строк дает одну пустую порцию, чтобы
+    импорт о нем сообщил.
+    """
+    with open(csv_file_path, 'rb') as data_csv_file:
+        lines = OffsetLines(data_csv_file)
+        header = next(csv.reader(lines), [])
+        if csv_file in fields_to_replace:
+            db_field, csv_field = fields_to_replace[csv_file]
+            header = [db_field if name == csv_field else name
+                      for name in header]
+        if offset > lines.offset:
+            data_csv_file.seek(offset - 1)
+            if data_csv_file.read(1) != b'\n':
+                raise CheckpointError(
+                    f'{csv_file}: сохраненная позиция {offset} не '
+                    'совпадает с концом строки, файл изменился.')
+            lines = OffsetLines(data_csv_file)
+        empty = True
+        for chunk in chunks(csv.reader(lines), batch_size):
+            yield model, csv_file, header, start, chunk, lines.offset
+            start += len(chunk)
+            empty = False
+        if empty:
+            yield model, csv_file, header, start, [], lines.offset
+
+
+def to_python(field, value):
+    if value == '' and field.null:
+        return None
+    return field.to_python(value)
+
+
+def parse_chunk(model, csv_file, header, start, rows, offset):
+    """Значения полей модели для порции строк файла."""
+    fields = [model._meta.get_field(name) for name in header]
+    parsed = []
+    for number, row in enumerate(rows, start):
+        if len(row) != len(fields):
+            raise ImportRowError(
+                f'{csv_file}, запись {number}: ожидалось {len(fields)} '
+                f'значений, получено {len(row)}.')
+        try:
+            parsed.append(tuple(
+                to_python(field, value) for field, value in zip(fields, row)
+            ))
+        except ValidationError as error:
+            raise ImportRowError(
+                f'{csv_file}, запись {number}: {"; ".join(error.messages)}')
+    return model, csv_file, header, start, parsed, offset
+
+
+def build(model, values):
+    """Объект модели из значений полей. bulk_create не вызывает save(),
+    поэтому вычисляемые в save() поля заполняются здесь."""
+    obj = model(**values)
+    if model is User:
+        obj.username_lower = obj.username.lower()
+    return obj
+
+
+def write_rows(model, header, rows, on_conflict, batch_size):
+    """
+    Вставляет строки порции. Строки с уже существующим первичным ключом
+    при on_conflict='skip' пропускаются, при 'update' - обновляются,
+    при 'error' вставка завершается IntegrityError.
+    """
+    objs = [build(model, dict(zip(header, values))) for values in rows]
+    if on_conflict != 'error' and objs:
+        pks = [obj.pk for obj in objs]
+        # Диапазон, а не IN: число параметров запроса не растет с порцией.
+        existing = set(model.objects.filter(
+            pk__gte=min(pks), pk__lte=max(pks)).values_list('pk', flat=True))
+        if existing and on_conflict == 'update':
+            fields = [name for name in header
+                      if name != model._meta.pk.attname]
+            if model is User:
+                fields.append('username_lower')
+            model.objects.bulk_update(
+                [obj for obj in objs if obj.pk in existing], fields,
+                batch_size=batch_size)
+        objs = [obj for obj in objs if obj.pk not in existing]
+    model.objects.bulk_create(objs, batch_size=batch_size)
+
+
+def secondary_indexes(model):
+    """
+    Вторичные индексы модели: (столбцы, индекс Meta.indexes или поле
+    внешнего ключа, по которому Django строит индекс).
+    """
+    indexes = [
+        ([model._meta.get_field(name).column
+          for name, _ in index.fields_orders], index)
+        for index in model._meta.indexes
+    ]
+    indexes += [
+        ([field.column], field) for field in model._meta.local_fields
+        if field.db_index and not field.unique and not field.primary_key
+    ]
+    return indexes
+
+
+def existing_indexes(model):
+    """Неуникальные индексы таблицы модели: {имя: столбцы}."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, model._meta.db_table)
+    return {
+        name: info['columns'] for name, info in constraints.items()
+        if info['index'] and not info['unique'] and not info['primary_key']
+    }
+
+
+def find_index(existing, columns, index):
+    if isinstance(index, Index):
+        return index.name if index.name in existing else None
+    return next((name for name, indexed in existing.items()
+                 if indexed == columns), None)
+
+
+@contextmanager
+def indexes_dropped(models):
+    """
+    Удаляет вторичные индексы моделей на время блока и строит их заново
+    после него, в том числе после ошибки. Индексы, которые не удалось
+    восстановить из-за остановки процесса, строит следующий импорт.
+    """
+    with connection.schema_editor() as editor:
+        for model in models:
+            existing = existing_indexes(model)
+            for columns, index in secondary_indexes(model):
+                name = find_index(existing, columns, index)
+                if name is None:
+                    continue
+                if isinstance(index, Index):
+                    editor.remove_index(model, index)
+                else:
+                    editor.execute(editor._delete_index_sql(model, name))
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model in models:
+                existing = existing_indexes(model)
+                for columns, index in secondary_indexes(model):
+                    if find_index(existing, columns, index) is not None:
+                        continue
+                    if isinstance(index, Index):
+                        editor.add_index(model, index)
+                    else:
+                        editor.execute(
+                            editor._create_index_sql(model, fields=[index]))
+
+
+class SerialExecutor(Executor):
+    """Разбор в текущем процессе: последовательный импорт."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+def get_executor(workers):
+    if workers <= 1:
+        return SerialExecutor()
+    # При запуске процессов через spawn Django в них нужно настроить.
+    return ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+
+
+def parsed_chunks(tasks, executor, window):
+    """Результаты parse_chunk в порядке задач; одновременно разбирается
+    не больше window порций, так что память не зависит от размера
+    файлов."""
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(parse_chunk, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def import_files(directory, batch_size, workers=None, report=print,
+                 resume=False, on_conflict='error'):
+    """
+    Импортирует файлы MODELS_CSV из каталога. Возвращает модели в порядке
+    импорта. report получает модель, имя файла, число строк и время.
+    resume=True продолжает с сохраненных позиций, иначе они сбрасываются.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    models = dependency_order(list(MODELS_CSV))
+    if resume:
+        checkpoints = {
+            checkpoint.file: checkpoint
+            for checkpoint in ImportCheckpoint.objects.all()
+        }
+    else:
+        ImportCheckpoint.objects.all().delete()
+        checkpoints = {}
+    tasks = []
+    for model in models:
+        csv_file = MODELS_CSV[model]
+        checkpoint = checkpoints.get(csv_file)
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint(file=csv_file)
+        elif checkpoint.done:
+            continue
+        tasks.append(read_chunks(
+            model, csv_file, os.path.join(directory, csv_file), batch_size,
+            offset=checkpoint.offset, start=checkpoint.rows + 1))
+
+    with indexes_dropped(models), get_executor(workers) as executor:
+        results = parsed_chunks(
+            (task for file_tasks in tasks for task in file_tasks),
+            executor, window=max(workers, 1) * 2)
+        for (model, csv_file), file_chunks in groupby(
+                results, key=lambda result: result[:2]):
+            started = time.perf_counter()
+            count = 0
+            checkpoint = ImportCheckpoint.objects.filter(file=csv_file)
+            if not checkpoint.exists():
+                ImportCheckpoint.objects.create(file=csv_file)
+            for _, _, header, start, rows, offset in file_chunks:
+                with transaction.atomic():
+                    write_rows(model, header, rows, on_conflict, batch_size)
+                    checkpoint.update(offset=offset,
+                                      rows=start + len(rows) - 1)
+                count += len(rows)
+            checkpoint.update(done=True)
+            report(model, csv_file, count, time.perf_counter() - started)
+    return models
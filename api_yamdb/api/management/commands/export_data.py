@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import EXPORT_CONTENT_TYPES, EXPORTS, export_stream
+from api.serializers import ExportQuerySerializer
+
+
+class Command(BaseCommand):
+    """Потоковая выгрузка отзывов и комментариев, как /api/v1/export/."""
+
+    help = 'Выгружает отзывы или комментарии в NDJSON или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(EXPORTS))
+        parser.add_argument(
+            '--output', choices=list(EXPORT_CONTENT_TYPES), default='ndjson')
+        parser.add_argument(
+            '--since', help='Дата публикации не раньше (ISO 8601).')
+        parser.add_argument(
+            '--until', help='Дата публикации раньше (ISO 8601).')
+        parser.add_argument(
+            '--file', help='Файл выгрузки; по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        query = ExportQuerySerializer(data={
+            name: options[name] for name in ('output', 'since', 'until')
+            if options[name] is not None
+        })
+        if not query.is_valid():
+            raise CommandError(query.errors)
+        stream = export_stream(options['kind'], **query.validated_data)
+        if options['file'] is None:
+            for chunk in stream:
+                self.stdout.write(chunk.decode(), ending='')
+            return
+        with open(options['file'], 'wb') as file:
+            for chunk in stream:
+                file.write(chunk)
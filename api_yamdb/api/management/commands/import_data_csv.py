@@ -1,28 +1,15 @@
-import csv
 import os
-from pathlib import Path
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection
 
-from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from api.cache import bump_versions
+from api.importing import (MODELS_CSV, ON_CONFLICT, CheckpointError,
+                           ImportRowError, import_files)
 from api_yamdb.settings import BASE_DIR
-from users.models import User
-
-MODELS_CSV = {
-    User: 'users.csv',
-    Category: 'category.csv',
-    Genre: 'genre.csv',
-    Title: 'titles.csv',
-    Review: 'review.csv',
-    Comment: 'comments.csv',
-    TitleGenre: 'genre_title.csv',
-}
-
-fields_to_replace = {
-    MODELS_CSV[Title]: ('category_id', 'category'),
-    MODELS_CSV[Review]: ('author_id', 'author'),
-    MODELS_CSV[Comment]: ('author_id', 'author'),
-}
 
 path_to_csv_directory = os.path.join(BASE_DIR, 'static/', 'data/')
 
@@ -30,28 +17,56 @@ path_to_csv_directory = os.path.join(BASE_DIR, 'static/', 'data/')
 class Command(BaseCommand):
     """Импорт данных из CSV в БД"""
 
-    def handle(self, *arg, **options):
-        def __init__(self, *arg, **kwargs):
-            super().__init__(*arg, **kwargs)
-
-        def import_csv(model, csv_file, csv_file_path):
-            with open(csv_file_path, 'r', encoding='utf-8') as data_csv_file:
-                reader = csv.DictReader(data_csv_file)
-                if csv_file in fields_to_replace:
-                    for row in reader:
-                        db_fields, scv_fields = fields_to_replace[csv_file]
-                        row[db_fields] = row.pop(scv_fields)
-                        model.objects.create(**row)
-                else:
-                    for row in reader:
-                        model.objects.create(**row)
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Данные из файла {csv_file} импортированы'
-                        f'в БД {model.__name__}.'
-                    )
-                )
-
-        for model, csv_file in MODELS_CSV.items():
-            csv_file_path = Path(path_to_csv_directory) / csv_file
-            import_csv(model, csv_file, csv_file_path)
+    help = ('Импортирует CSV-файлы в порядке внешних ключей: строки '
+            'разбираются в пуле процессов и вставляются порциями через '
+            'bulk_create; позиция каждой порции сохраняется, и прерванный '
+            'импорт можно продолжить (--resume). После импорта '
+            'пересчитываются агрегаты.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=path_to_csv_directory,
+            help='Каталог с CSV-файлами.')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE,
+            help='Число строк в одной вставке.')
+        parser.add_argument(
+            '--workers', type=int, default=settings.IMPORT_WORKERS,
+            help='Процессы разбора CSV; 0 или 1 - разбор в текущем '
+                 'процессе. По умолчанию - число ядер.')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванный импорт с последней '
+                 'зафиксированной порции.')
+        parser.add_argument(
+            '--on-conflict', choices=ON_CONFLICT, default='error',
+            help='Строки с существующим id: ошибка, пропуск или '
+                 'обновление.')
+
+    def handle(self, *args, **options):
+        try:
+            models = import_files(
+                options['path'], options['batch_size'],
+                workers=options['workers'], report=self.report,
+                resume=options['resume'],
+                on_conflict=options['on_conflict'])
+        except (ImportRowError, CheckpointError) as error:
+            raise CommandError(error)
+        # id берутся из файлов: счетчики автоинкремента нужно сдвинуть.
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+        # bulk_create не отправляет сигналы: рейтинги, счетчики и
+        # версии кэша обновляются разом после импорта.
+        call_command('rebuild_aggregates', stdout=self.stdout)
+        bump_versions(*MODELS_CSV)
+
+    def report(self, model, csv_file, count, elapsed):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Данные из файла {csv_file} импортированы '
+                f'в БД {model.__name__}: {count} строк за {elapsed:.2f} с '
+                f'({count / elapsed:.0f} строк/с).'
+            )
+        )
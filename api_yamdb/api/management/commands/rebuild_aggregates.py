@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import AGGREGATES, bump_versions
+from reviews.aggregates import (rebuild_comment_counts, rebuild_title_ratings,
+                                rebuild_title_scores)
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Пересчет хранимых агрегатов отзывов."""
+
+    help = ('Пересчитывает рейтинги и гистограммы оценок произведений, '
+            'счетчики комментариев отзывов и таблицы рейтингов.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            titles = rebuild_title_ratings()
+            buckets = rebuild_title_scores()
+            reviews = rebuild_comment_counts()
+            rebuild_leaderboards()
+        bump_versions(Title, AGGREGATES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны: {titles} произведений, '
+            f'{buckets} столбцов гистограмм оценок; '
+            f'счетчики комментариев исправлены у {reviews} отзывов.'
+        ))
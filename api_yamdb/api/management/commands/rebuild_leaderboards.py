@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import bump_versions
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    """Периодическая пересборка материализованных рейтингов."""
+
+    help = ('Пересобирает рейтинги произведений (общий, по категориям '
+            'и жанрам) по хранимым агрегатам отзывов.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            entries = rebuild_leaderboards()
+        bump_versions(Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинги пересобраны: {entries} строк.')
+        )
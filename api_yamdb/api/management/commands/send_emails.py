@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import deliver_pending, purge_finished
+
+
+class Command(BaseCommand):
+    """Фоновая отправка писем из очереди (outbox)."""
+
+    help = ('Отправляет письма из очереди порциями и удаляет старые '
+            'отправленные и отброшенные; без --once работает постоянно, '
+            'опрашивая очередь.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить все готовые письма и завершиться.')
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--interval', type=float,
+            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, секунды.')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        purged_at = None
+        while True:
+            if (purged_at is None or time.monotonic() - purged_at
+                    >= settings.EMAIL_OUTBOX_PURGE_INTERVAL):
+                purged = purge_finished()
+                purged_at = time.monotonic()
+                if purged:
+                    self.stdout.write(f'Удалено старых писем: {purged}.')
+            sent, failed = deliver_pending(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, с ошибкой: {failed}.')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Очередь пуста. Отправлено: {total_sent}, '
+            f'с ошибкой: {total_failed}.'))
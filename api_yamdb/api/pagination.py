@@ -0,0 +1,42 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация по естественному порядку представления."""
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+
+class LeaderboardPagination(KeysetPagination):
+    """Курсорные страницы рейтинга размером до LIMIT_LEADERBOARD_PAGE."""
+    page_size_query_param = 'page_size'
+    max_page_size = settings.LIMIT_LEADERBOARD_PAGE
+
+
+class PageOrCursorPagination(PageNumberPagination):
+    """
+    Постраничная пагинация по умолчанию и курсорная по параметру cursor.
+    Для первой курсорной страницы достаточно пустого `?cursor=`: такие
+    страницы не выполняют COUNT и OFFSET по всей таблице.
+    """
+    cursor_query_param = KeysetPagination.cursor_query_param
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
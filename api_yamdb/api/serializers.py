@@ -2,13 +2,20 @@ import datetime as dt
 
 from django.conf import settings
 from django.core.validators import RegexValidator
+from django.db import connections, transaction
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework.validators import UniqueValidator
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.leaderboards import refresh_leaderboards
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title, TitleGenre)
 from users.models import User
+from .cache import bump_versions
+from .export import EXPORT_CONTENT_TYPES
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -17,19 +24,33 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True, slug_field='username',
     )
 
-    def validate(self, data):
-        author = self.context['request'].user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        if self.context['request'].method == 'POST':
-            current = Review.objects.filter(author=author, title_id=title_id)
-            if current.first():
-                raise ValidationError("Запрещено оставлять два отзыва на одно"
-                                      "произведение!")
-        return data
-
     class Meta:
         model = Review
-        fields = ('author', 'id', 'pub_date', 'text', 'score')
+        fields = ('author', 'id', 'pub_date', 'text', 'score',
+                  'comment_count')
+
+
+class LatestReviewsQuerySerializer(serializers.Serializer):
+    """Параметры запроса последних отзывов нескольких произведений."""
+    titles = serializers.CharField()
+    per_title = serializers.IntegerField(
+        min_value=1, max_value=settings.LIMIT_LATEST_REVIEWS, default=3)
+
+    def validate_titles(self, value):
+        try:
+            titles = list(dict.fromkeys(
+                int(title_id) for title_id in value.split(',')
+                if title_id.strip()
+            ))
+        except ValueError:
+            raise ValidationError('Укажите id произведений через запятую.')
+        if not titles:
+            raise ValidationError('Укажите хотя бы одно произведение.')
+        if len(titles) > settings.LIMIT_LATEST_TITLES:
+            raise ValidationError(
+                f'Не больше {settings.LIMIT_LATEST_TITLES} произведений '
+                'за запрос.')
+        return titles
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -88,7 +109,8 @@ class TitleSerializer(serializers.ModelSerializer):
         return value
 
     def to_representation(self, instance):
-        representation = TitleRetriveSerializer(instance).data
+        representation = TitleRetriveSerializer(
+            instance, context=self.context).data
         return representation
 
 
@@ -100,8 +122,219 @@ class TitleRetriveSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
-                                        'description', 'genre', 'category')
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
+                  'description', 'genre', 'category')
+
+
+class ScoreDistributionSerializer(serializers.BaseSerializer):
+    """Гистограмма оценок произведения ({оценка: число отзывов}) и ее
+    среднее, медиана и стандартное отклонение."""
+    scores = range(1, 11)
+
+    def to_representation(self, histogram):
+        counts = [histogram.get(score, 0) for score in self.scores]
+        total = sum(counts)
+        mean = median = stddev = None
+        if total:
+            mean = sum(
+                score * count for score, count in zip(self.scores, counts)
+            ) / total
+            stddev = (sum(
+                count * (score - mean) ** 2
+                for score, count in zip(self.scores, counts)
+            ) / total) ** 0.5
+            median = (self.nth_score(counts, (total - 1) // 2)
+                      + self.nth_score(counts, total // 2)) / 2
+        return {
+            'count': total,
+            'mean': mean,
+            'median': median,
+            'stddev': stddev,
+            'distribution': [
+                {'score': score, 'count': count}
+                for score, count in zip(self.scores, counts)
+            ],
+        }
+
+    def nth_score(self, counts, index):
+        """Оценка отзыва с номером index в порядке возрастания оценок."""
+        for score, count in zip(self.scores, counts):
+            if index < count:
+                return score
+            index -= count
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """Параметры рейтинга: порядок, категория или жанр, порог отзывов."""
+    order = serializers.ChoiceField(
+        choices=('rating', 'reviews'), default='rating')
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    min_reviews = serializers.IntegerField(
+        min_value=1, default=settings.LEADERBOARD_MIN_REVIEWS)
+
+    def validate(self, data):
+        if 'category' in data and 'genre' in data:
+            raise ValidationError('Укажите категорию или жанр, но не оба.')
+        return data
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Сериализует строки рейтинга произведений."""
+    name = serializers.CharField(source='title.name')
+    year = serializers.IntegerField(source='title.year')
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ('title', 'name', 'year', 'rating', 'review_count')
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """Параметры выгрузки: формат и полуинтервал дат публикации."""
+    output = serializers.ChoiceField(
+        choices=list(EXPORT_CONTENT_TYPES), default='ndjson')
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Ищет объекты по slug в словаре из контекста, а не запросом к БД."""
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.context[self.context_key][data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        except TypeError:
+            self.fail('invalid')
+
+
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """
+    Массовое создание (instance=None) и изменение (instance - queryset
+    изменяемых произведений) в одной транзакции. Жанры, категории
+    и изменяемые произведения загружаются одним запросом каждые.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            if len(data) > settings.LIMIT_BULK_TITLES:
+                raise ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Не больше {} произведений за запрос.'.format(
+                            settings.LIMIT_BULK_TITLES)]
+                })
+            self.preload(
+                [item for item in data if isinstance(item, dict)])
+        return super().to_internal_value(data)
+
+    def preload(self, items):
+        genres = {slug for item in items
+                  if isinstance(item.get('genre'), list)
+                  for slug in item['genre'] if isinstance(slug, str)}
+        categories = {item['category'] for item in items
+                      if isinstance(item.get('category'), str)}
+        self._context['genres'] = Genre.objects.in_bulk(
+            genres, field_name='slug')
+        self._context['categories'] = Category.objects.in_bulk(
+            categories, field_name='slug')
+        if self.instance is not None:
+            ids = {str(item.get('id')) for item in items}
+            self._context['titles'] = self.instance.in_bulk(
+                [int(pk) for pk in ids if pk.isdigit()])
+            # id, уже встреченные в запросе: повтор изменил бы
+            # произведение дважды и продублировал связи с жанрами.
+            self._context['seen_ids'] = set()
+
+    def create(self, validated_data):
+        titles = [Title(**self.title_fields(item)) for item in validated_data]
+        with transaction.atomic():
+            Title.objects.bulk_create(titles)
+            if titles and titles[0].pk is None:
+                self.load_pks(titles)
+            self.save_genres(titles, validated_data)
+        return titles
+
+    @staticmethod
+    def load_pks(titles):
+        """
+        Первичные ключи вставленных произведений, если bulk_create их не
+        вернул (нет RETURNING, как у SQLite в Django 3.2). С первой вставки
+        до конца транзакции SQLite не пускает других писателей, поэтому
+        новые строки - последние по id и идут в порядке вставки.
+        """
+        connection = connections[Title.objects.db]
+        if connection.vendor != 'sqlite':
+            raise NotImplementedError(
+                'Первичные ключи без RETURNING читаются только в SQLite.')
+        pks = Title.objects.order_by('-pk').values_list(
+            'pk', flat=True)[:len(titles)]
+        for title, pk in zip(titles, reversed(pks)):
+            title.pk = pk
+
+    def update(self, instance, validated_data):
+        titles, fields = [], set()
+        for item in validated_data:
+            title = self.context['titles'][item['id']]
+            for attr, value in self.title_fields(item).items():
+                setattr(title, attr, value)
+                fields.add(attr)
+            titles.append(title)
+        with transaction.atomic():
+            if fields:
+                Title.objects.bulk_update(titles, fields)
+            TitleGenre.objects.filter(title__in=[
+                title for title, item in zip(titles, validated_data)
+                if 'genre' in item
+            ]).delete()
+            self.save_genres(titles, validated_data)
+            refresh_leaderboards([title.pk for title in titles])
+        return titles
+
+    @staticmethod
+    def title_fields(item):
+        return {attr: value for attr, value in item.items()
+                if attr not in ('id', 'genre')}
+
+    @staticmethod
+    def save_genres(titles, validated_data):
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genre)
+            for title, item in zip(titles, validated_data)
+            for genre in dict.fromkeys(item.get('genre', ()))
+        )
+        # bulk_create и bulk_update не отправляют сигналы.
+        bump_versions(Title, TitleGenre)
+
+
+class TitleBulkSerializer(TitleSerializer):
+    """Элемент массового создания или изменения произведений."""
+    id = serializers.IntegerField(required=False)
+    genre = PreloadedSlugRelatedField(
+        'genres', queryset=Genre.objects.all(),
+        required=False, many=True, slug_field='slug')
+    category = PreloadedSlugRelatedField(
+        'categories', queryset=Category.objects.all(),
+        required=False, slug_field='slug')
+
+    class Meta(TitleSerializer.Meta):
+        list_serializer_class = TitleBulkListSerializer
+
+    def validate(self, data):
+        if self.root.instance is None:
+            data.pop('id', None)
+        elif data.get('id') not in self.context['titles']:
+            raise ValidationError({'id': 'Произведение не найдено.'})
+        elif data['id'] in self.context['seen_ids']:
+            raise ValidationError({'id': 'Произведение уже есть в запросе.'})
+        else:
+            self.context['seen_ids'].add(data['id'])
+        return data
 
 
 class RegistrationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from reviews.models import Category, Comment, Genre, Review, Title, TitleGenre
+from users.models import User
+from .authentication import bump_user_version, user_cache
+from .cache import bump_versions, scope
+
+# Модели, версии которых входят в ключи кэша ответов и ETag. Пользователи
+# видны только как авторы: их изменения отмечает bump_author_versions.
+CACHED_MODELS = (Title, Genre, Category, TitleGenre, Review, Comment)
+
+
+def bump_model_version(sender, **kwargs):
+    bump_versions(sender)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_model_version, sender=model)
+    post_delete.connect(bump_model_version, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genre_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_versions(TitleGenre)
+
+
+@receiver(post_delete, sender=Title)
+def bump_title_reviews_version(sender, instance, **kwargs):
+    # Список отзывов удаленного произведения теперь отвечает 404.
+    bump_versions(scope(Review, 'title', instance.pk))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_scope_version(sender, instance, **kwargs):
+    bump_versions(
+        scope(Review, 'title', instance.title_id),
+        scope(Comment, 'review', instance.pk),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_scope_version(sender, instance, **kwargs):
+    # Отзывы произведения показывают comment_count.
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = Review.objects.filter(
+            pk=instance.review_id).values_list('title_id', flat=True).first()
+    bump_versions(
+        scope(Comment, 'review', instance.review_id),
+        scope(Review, 'title', title_id),
+    )
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._saved_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def bump_author_versions(sender, instance, created, **kwargs):
+    """
+    Отзывы и комментарии показывают username автора: его смена меняет
+    только списки с записями этого пользователя. Удаление пользователя
+    удаляет и записи, их версии отмечают сигналы отзывов и комментариев.
+    """
+    saved_username = instance._saved_username
+    instance._saved_username = instance.username
+    if created or saved_username in (None, instance.username):
+        return
+    title_ids = Review.objects.filter(author=instance).values_list(
+        'title_id', flat=True)
+    review_ids = Comment.objects.filter(author=instance).values_list(
+        'review_id', flat=True).distinct()
+    bump_versions(
+        *(scope(Review, 'title', title_id) for title_id in title_ids),
+        *(scope(Comment, 'review', review_id) for review_id in review_ids),
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # И после фиксации: параллельный запрос мог успеть закэшировать
+    # строку, прочитанную до нее.
+    user_id = getattr(instance, jwt_settings.USER_ID_FIELD)
+
+    def invalidate():
+        user_cache.delete(user_id)
+        bump_user_version(user_id)
+
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,106 @@
+"""
+Ограничение частоты запросов по алгоритму token bucket.
+
+Корзина клиента хранит в кэше пару (число жетонов, время обновления).
+Жетоны пополняются равномерно со скоростью из DEFAULT_THROTTLE_RATES
+('10/min' - корзина на 10 запросов, полностью пополняется за минуту),
+каждый запрос забирает один. Проверка - чтение и запись корзины под
+блокировкой (cache.add атомарен и в общем кэше), без обращений к БД
+и без хранения истории запросов, как у SimpleRateThrottle.
+"""
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Блокировка корзины: срок жизни на случай упавшего процесса и сколько
+# ее ждать, секунд.
+LOCK_TIMEOUT = 5
+LOCK_WAIT = 0.5
+LOCK_POLL_INTERVAL = 0.001
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60): емкость корзины и время ее пополнения."""
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Корзина на область (scope) и клиента: пользователя, если он
+    авторизован, иначе IP-адрес. Область задается атрибутом scope
+    класса или throttle_scope представления; методы, к которым
+    применяется ограничение, - атрибутом methods (None - все).
+    """
+    cache = default_cache
+    cache_format = 'throttle:{scope}:{ident}'
+    scope = None
+    methods = None
+    timer = time.time
+
+    def allow_request(self, request, view):
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        scope = self.scope or getattr(view, 'throttle_scope', None)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        capacity, duration = parse_rate(rate)
+        refill = capacity / duration
+
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        key = self.cache_format.format(scope=scope, ident=ident)
+        with self.locked(key) as acquired:
+            if not acquired:
+                # Корзину держат параллельные запросы того же клиента.
+                self.wait_time = 1 / refill
+                return False
+            now = self.timer()
+            tokens, updated = self.cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            if tokens < 1:
+                self.wait_time = (1 - tokens) / refill
+                return False
+            # Отсутствующий ключ равен полной корзине, поэтому запись
+            # живет не дольше, чем корзина пополняется.
+            self.cache.set(key, (tokens - 1, now), timeout=duration)
+        return True
+
+    @contextmanager
+    def locked(self, key):
+        """Блокировка корзины: без нее параллельные запросы прочитали бы
+        одну и ту же корзину и потратили один жетон на всех."""
+        lock_key = f'{key}:lock'
+        deadline = time.monotonic() + LOCK_WAIT
+        while not self.cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                yield False
+                return
+            time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield True
+        finally:
+            self.cache.delete(lock_key)
+
+    def wait(self):
+        return self.wait_time
+
+
+class SignupThrottle(TokenBucketThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(TokenBucketThrottle):
+    scope = 'token'
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Ограничивает только создание объектов (throttle_scope вьюсета)."""
+    methods = ('POST',)
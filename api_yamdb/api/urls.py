@@ -2,7 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_jwt_token,
+                    LeaderboardViewSet, ReviewViewSet, TitleViewSet,
+                    UserViewSet, export, get_jwt_token, latest_reviews,
                     registration)
 
 app_name = 'api'
@@ -14,6 +15,7 @@ router.register('users', UserViewSet, 'user')
 router.register('categories', CategoryViewSet, basename='categories')
 router.register('genres', GenreViewSet, basename='genres')
 router.register('titles', TitleViewSet, basename='titles')
+router.register('leaderboard', LeaderboardViewSet, basename='leaderboard')
 router.register(r'^titles/(?P<title_id>\d+)/reviews', ReviewViewSet,
                 basename='reviews')
 router.register(
@@ -26,6 +28,11 @@ urlpatterns_auth = [
 ]
 
 urlpatterns = [
+    path('v1/reviews/latest/', latest_reviews, name='latest_reviews'),
+    path('v1/export/reviews/', export, {'kind': 'reviews'},
+         name='export_reviews'),
+    path('v1/export/comments/', export, {'kind': 'comments'},
+         name='export_comments'),
     path('v1/', include(router.urls)),
     path('v1/auth/', include(urlpatterns_auth)),
 ]
@@ -1,130 +1,355 @@
-from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.filters import SearchFilter
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework.exceptions import ValidationError
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title, TitleGenre, TitleScore)
 from users.models import User
-from .filters import TitleFilter
-from .viewsets import CLDslugViewSet, PutNoViewSet
+from users.outbox import enqueue_email
+from .cache import AGGREGATES, scope
+from .export import EXPORT_CONTENT_TYPES, export_stream
+from .fast_serializers import (CommentValuesSerializer, ReviewValuesSerializer,
+                               TitleValuesSerializer)
+from .filters import TitleFilter, UserFilter
+from .pagination import LeaderboardPagination, PageOrCursorPagination
+from .viewsets import (CachedListMixin, CachedRetrieveMixin, CLDslugViewSet,
+                       ConditionalGetMixin, PutNoViewSet, ValuesListMixin)
 
 from .permissions import (IsAdminOrReadOnly, IsAdminOrSuperUser,
                           IsAuthenticatedOrReadOnly,
                           IsStaffOrAuthorOrReadOnly)
 from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, RegistrationSerializer,
-                          ReviewSerializer, TitleRetriveSerializer,
-                          TitleSerializer, TokenSerializer, UserEditSerializer,
-                          UserSerializer)
+                          ExportQuerySerializer, GenreSerializer,
+                          LatestReviewsQuerySerializer,
+                          LeaderboardEntrySerializer,
+                          LeaderboardQuerySerializer, RegistrationSerializer,
+                          ReviewSerializer, ScoreDistributionSerializer,
+                          TitleBulkSerializer, TitleRetriveSerializer,
+                          TitleSerializer, TokenSerializer,
+                          UserEditSerializer, UserSerializer)
+from .throttling import SignupThrottle, TokenThrottle, WriteThrottle
 
+# Поля отзыва для ReviewSerializer: автор загружается тем же запросом.
+REVIEW_FIELDS = ('id', 'title_id', 'author__username', 'pub_date', 'text',
+                 'score', 'comment_count')
 
-class ReviewViewSet(PutNoViewSet):
+
+class ReviewViewSet(ConditionalGetMixin, ValuesListMixin, PutNoViewSet):
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     http_method_names = ['get', 'post', 'delete', 'patch']
     permission_classes = [IsStaffOrAuthorOrReadOnly]
+    throttle_classes = [WriteThrottle]
+    throttle_scope = 'reviews'
+    pagination_class = PageOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
+
+    def check_title(self):
+        """404, если произведения нет."""
+        if not Title.objects.filter(pk=self.kwargs.get('title_id')).exists():
+            raise Http404
+
+    def get_version_keys(self):
+        return (AGGREGATES,
+                scope(Review, 'title', int(self.kwargs['title_id'])))
 
-    def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+    def get_anchor_queryset(self):
+        if self.action == 'list':
+            return Title.objects.filter(pk=self.kwargs['title_id'])
+        return super().get_anchor_queryset()
 
     def perform_create(self, serializer):
-        serializer.save(title=self.get_title(), author=self.request.user)
+        # Повторный отзыв отсекает UniqueConstraint(author, title): без
+        # предварительной выборки и без гонки между параллельными POST.
+        self.check_title()
+        try:
+            serializer.save(title_id=int(self.kwargs['title_id']),
+                            author=self.request.user)
+        except IntegrityError:
+            # Произведение могло быть удалено между проверкой и вставкой.
+            self.check_title()
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Запрещено оставлять два отзыва на одно произведение!'
+            ]})
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author').only(*REVIEW_FIELDS)
 
 
-class CommentViewSet(PutNoViewSet):
+class CommentViewSet(ConditionalGetMixin, ValuesListMixin, PutNoViewSet):
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     http_method_names = ['get', 'post', 'delete', 'patch']
     permission_classes = [IsStaffOrAuthorOrReadOnly]
+    throttle_classes = [WriteThrottle]
+    throttle_scope = 'comments'
+    pagination_class = PageOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
+
+    def get_version_keys(self):
+        # AGGREGATES отмечает и массовую загрузку (import_data_csv).
+        return (AGGREGATES,
+                scope(Comment, 'review', int(self.kwargs['review_id'])))
+
+    def get_anchor_queryset(self):
+        if self.action == 'list':
+            return Review.objects.filter(pk=self.kwargs['review_id'],
+                                         title_id=self.kwargs['title_id'])
+        return super().get_anchor_queryset()
+
+    def check_review(self):
+        """404, если отзыва нет или он к другому произведению."""
+        if not Review.objects.filter(
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+        ).exists():
+            raise Http404
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'),
-                                   title=title)
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author').only(
+            'id', 'review_id', 'author__username', 'pub_date', 'text')
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        review = get_object_or_404(Review, title=title,
-                                   id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        self.check_review()
+        serializer.save(author=self.request.user,
+                        review_id=int(self.kwargs['review_id']))
 
 
-class CategoryViewSet(CLDslugViewSet):
+class CategoryViewSet(CachedListMixin, CLDslugViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     pagination_class = PageNumberPagination
+    cache_dependencies = (Category,)
 
 
-class GenreViewSet(CLDslugViewSet):
+class GenreViewSet(CachedListMixin, CLDslugViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_dependencies = (Genre,)
 
 
-class TitleViewSet(PutNoViewSet):
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')).all().order_by('pk')
+class TitleViewSet(ConditionalGetMixin, CachedListMixin, CachedRetrieveMixin,
+                   ValuesListMixin, PutNoViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre').order_by('pk')
     serializer_class = TitleSerializer
+    values_serializer_class = TitleValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
+    cursor_ordering = ('id',)
+    lookup_value_regex = r'\d+'
     filterset_class = TitleFilter
+    cache_dependencies = (Title, Genre, Category, TitleGenre, Review)
 
     search_fields = ('name', 'queryset')
 
+    def get_version_keys(self):
+        if self.action == 'retrieve':
+            # Рейтинг произведения меняют только его отзывы и пересчет
+            # агрегатов, а не любой отзыв в таблице.
+            return (Title, Genre, Category, TitleGenre, AGGREGATES,
+                    scope(Review, 'title', int(self.kwargs['pk'])))
+        return self.cache_dependencies
+
     def get_serializer_class(self):
         if self.action in ('retrieve', 'list'):
             return TitleRetriveSerializer
+        if self.action == 'bulk':
+            return TitleBulkSerializer
         return TitleSerializer
 
+    @action(methods=['post', 'patch'], detail=False, url_path='bulk')
+    def bulk(self, request):
+        """Массовое создание (POST) или изменение (PATCH, с id)
+        произведений. Ошибки возвращаются списком по элементам."""
+        creating = request.method == 'POST'
+        serializer = self.get_serializer(
+            None if creating else Title.objects.all(),
+            data=request.data, many=True, partial=not creating)
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        saved = self.get_queryset().in_bulk([title.pk for title in titles])
+        return Response(
+            TitleRetriveSerializer(
+                [saved[title.pk] for title in titles], many=True).data,
+            status=status.HTTP_201_CREATED if creating else status.HTTP_200_OK
+        )
+
+    @action(methods=['get'], detail=True, url_path='score-distribution')
+    def score_distribution(self, request, pk=None):
+        """Распределение оценок по хранимой гистограмме произведения."""
+        return self.cached_response(
+            self.get_score_distribution, request, pk=pk)
+
+    def get_score_distribution(self, request, pk=None):
+        histogram = dict(TitleScore.objects.filter(
+            title_id=pk, count__gt=0).values_list('score', 'count'))
+        if not histogram and not Title.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response(ScoreDistributionSerializer(histogram).data)
+
+
+class LeaderboardViewSet(CachedListMixin, mixins.ListModelMixin,
+                         viewsets.GenericViewSet):
+    """Материализованный рейтинг произведений: общий, по категории
+    (?category=) или жанру (?genre=), по оценке или числу отзывов."""
+    serializer_class = LeaderboardEntrySerializer
+    pagination_class = LeaderboardPagination
+    cache_dependencies = (Title, Genre, Category, TitleGenre, Review)
+    orderings = {
+        'rating': ('-rating', '-review_count', 'title_id'),
+        'reviews': ('-review_count', '-rating', 'title_id'),
+    }
+
+    @property
+    def cursor_ordering(self):
+        return self.orderings[self.query['order']]
+
+    def get_queryset(self):
+        query = LeaderboardQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        self.query = query.validated_data
+        entries = LeaderboardEntry.objects.filter(
+            review_count__gte=self.query['min_reviews'])
+        if 'category' in self.query:
+            entries = entries.filter(
+                category__slug=self.query['category'], genre=None)
+        elif 'genre' in self.query:
+            entries = entries.filter(
+                category=None, genre__slug=self.query['genre'])
+        else:
+            entries = entries.filter(category=None, genre=None)
+        return entries.select_related('title').only(
+            'title', 'title__name', 'title__year', 'rating', 'review_count')
+
+
+def latest_reviews_queryset(title_ids, per_title):
+    """Не больше per_title последних отзывов каждого произведения.
+    Номер отзыва в произведении считает оконная функция, поэтому
+    выборка - один запрос при любом числе произведений."""
+    ranked = Review.objects.filter(title_id__in=title_ids).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('title_id')],
+            order_by=[F('pub_date').desc(), F('id').desc()],
+        )
+    ).values('id', 'position')
+    sql, params = ranked.query.sql_with_params()
+    return Review.objects.filter(pk__in=RawSQL(
+        f'SELECT id FROM ({sql}) ranked WHERE position <= %s',
+        (*params, per_title),
+    )).select_related('author').only(*REVIEW_FIELDS).order_by(
+        'title_id', '-pub_date', '-id')
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def latest_reviews(request):
+    """Последние отзывы нескольких произведений:
+    ?titles=1,2,3&per_title=3."""
+    query = LatestReviewsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    titles = query.validated_data['titles']
+    reviews = list(latest_reviews_queryset(
+        titles, query.validated_data['per_title']))
+    by_title = {title_id: [] for title_id in titles}
+    for review, data in zip(reviews,
+                            ReviewSerializer(reviews, many=True).data):
+        by_title[review.title_id].append(data)
+    return Response([
+        {'title': title_id, 'reviews': title_reviews}
+        for title_id, title_reviews in by_title.items()
+    ])
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminOrSuperUser])
+def export(request, kind):
+    """Потоковая выгрузка отзывов или комментариев для администратора:
+    ?output=ndjson|csv&since=...&until=..."""
+    query = ExportQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    output = query.validated_data['output']
+    response = StreamingHttpResponse(
+        export_stream(kind, **query.validated_data),
+        content_type=EXPORT_CONTENT_TYPES[output],
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{kind}.{output}"')
+    return response
+
+
+def registered_user(username, email):
+    """
+    Пользователь с данными username и email: существующий или новый.
+    Конфликты ищутся одним запросом по username или email, вставку
+    защищают уникальные индексы: если параллельный запрос успел создать
+    пользователя, поиск повторяется.
+    """
+    lookup = User.objects.filter(
+        Q(username=username) | Q(email=email)).order_by()[:2]
+    users = list(lookup)
+    if not users:
+        try:
+            with transaction.atomic():
+                return User.objects.create(username=username, email=email)
+        except IntegrityError:
+            users = list(lookup.all())
+    if not users or any(user.email == email and user.username != username
+                        for user in users):
+        raise ValidationError("пользователь с таким email уже существует")
+    if any(user.email != email for user in users):
+        raise ValidationError("пользователь с таким username"
+                              "уже существует")
+    return users[0]
+
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([SignupThrottle])
 def registration(request):
     """Регистрация пользователя"""
     serializer = RegistrationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data['username']
     email = serializer.validated_data['email']
-    with_email = User.objects.filter(email=email).first()
-    with_username = User.objects.filter(username=username).first()
-    if with_email:
-        if with_email.username != username:
-            raise ValidationError("пользователь с таким email уже существует")
-    if with_username:
-        if with_username.email != email:
-            raise ValidationError("пользователь с таким username"
-                                  "уже существует")
-    user, _ = User.objects.get_or_create(
-        username=serializer.data["username"],
-        email=serializer.data["email"]
-    )
-
-    confirmation_code = default_token_generator.make_token(user)
-
-    send_mail(
-        subject="Регистрация на YaMDb",
-        message=f"Ваш код активации: {confirmation_code}",
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[user.email],
-        fail_silently=False
-    )
+    # Письмо ставится в очередь в той же транзакции, что и пользователь,
+    # и отправляется командой send_emails, не задерживая ответ.
+    with transaction.atomic():
+        user = registered_user(username, email)
+        confirmation_code = default_token_generator.make_token(user)
+        enqueue_email(
+            subject="Регистрация на YaMDb",
+            body=f"Ваш код активации: {confirmation_code}",
+            recipient=user.email,
+        )
 
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([TokenThrottle])
 def get_jwt_token(request):
     """Получение jwt токена"""
     serializer = TokenSerializer(data=request.data)
@@ -143,13 +368,20 @@ class UserViewSet(viewsets.ModelViewSet):
     """Администратор получает список пользователей или создает нового"""
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    filter_backends = (SearchFilter,)
+    filter_backends = (DjangoFilterBackend, SearchFilter)
+    filterset_class = UserFilter
     lookup_field = 'username'
     search_fields = ('username',)
     permission_classes = (IsAdminOrSuperUser, IsAuthenticatedOrReadOnly,)
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    @property
+    def cursor_ordering(self):
+        if self.request.query_params.get('username'):
+            return UserFilter.prefix_ordering
+        return ('-username',)
+
     @action(
         methods=['get', 'patch'],
         detail=False,
@@ -1,10 +1,145 @@
-from rest_framework import mixins, viewsets
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.cache import quote_etag
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import mixins, status, viewsets
 from rest_framework import filters
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
+from .cache import request_fingerprint, response_cache_key, stored_versions
 from .permissions import IsAdminOrReadOnly
 
 
+class CachedResponseMixin:
+    """
+    Кэширует ответы GET. Ключ включает версии моделей из
+    cache_dependencies, поэтому любая запись в них сбрасывает кэш. Если
+    версии уже прочитал ConditionalGetMixin (resource_versions), ключ
+    строится из них: тело ответа всегда соответствует его ETag.
+    """
+    cache_dependencies = ()
+    resource_versions = None
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        # Версии читаются до выполнения запроса: ответ, посчитанный во
+        # время записи, попадет под старый ключ и не будет использован.
+        versions = self.resource_versions
+        if versions is None:
+            versions = stored_versions(self.cache_dependencies)
+        key = response_cache_key(
+            request, (self.basename, self.action), versions)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class ValuesListMixin:
+    """Список через values_serializer_class, минуя поля DRF."""
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.values_serializer_class()
+        queryset = serializer.prepare(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для list и retrieve по версиям из
+    get_version_keys(), хранимым в БД. Версии читаются одним запросом
+    вместе с проверкой, что ресурс существует; неизменившийся ресурс
+    отвечает 304 без сериализации. С кэшем ответов эти же версии входят
+    в его ключ, поэтому get_version_keys() покрывает cache_dependencies.
+    """
+
+    def get_version_keys(self):
+        raise NotImplementedError
+
+    def get_anchor_queryset(self):
+        """
+        Запрос, находящий объект ресурса: без него 304 нельзя отличить от
+        404. None - ресурс существует всегда (список без родителя).
+        """
+        if self.action != 'retrieve':
+            return None
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return self.get_queryset().filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = stored_versions(
+            self.get_version_keys(), self.get_anchor_queryset())
+        if versions is None:
+            raise Http404
+        self.resource_versions = versions
+        etag = quote_etag(request_fingerprint(
+            request, self.action, request.accepted_renderer.format,
+            versions))
+        # Секунды округляются вверх: Last-Modified не раньше записи.
+        last_modified = -(-max(versions) // 10 ** 9)
+        if self.is_not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        # Пока секунда записи не кончилась, в ней возможна еще одна
+        # запись с той же Last-Modified: заголовок отдается только после.
+        if 0 < last_modified * 10 ** 9 <= time.time_ns():
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    @staticmethod
+    def is_not_modified(request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            if if_none_match.strip() == '*':
+                return True
+            # If-None-Match сравнивает метки без учета слабости (W/).
+            return etag in (
+                tag[2:] if tag.startswith('W/') else tag
+                for tag in parse_etags(if_none_match)
+            )
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'))
+        return (if_modified_since is not None
+                and last_modified <= if_modified_since)
+
+
 class CLDslugViewSet(
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
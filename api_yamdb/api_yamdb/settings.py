@@ -78,6 +78,27 @@ DATABASES = {
 }
 
 
+# Cache
+
+# LocMemCache у каждого процесса свой. При нескольких процессах сервера
+# нужен общий кэш, например
+# CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+# и CACHE_LOCATION=127.0.0.1:11211: через него все процессы узнают об
+# изменении пользователя (api/authentication.py, проверка api.E001).
+LOCMEM_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', LOCMEM_CACHE_BACKEND),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'api_yamdb'),
+    }
+}
+if CACHES['default']['BACKEND'] == LOCMEM_CACHE_BACKEND:
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+RESPONSE_CACHE_TIMEOUT = 300
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -121,11 +142,27 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.'
                                 'PageNumberPagination',
     "PAGE_SIZE": 10,
+    # Емкость корзины и время ее пополнения (api.throttling).
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '20/min',
+        'token': '30/min',
+        'reviews': '30/min',
+        'comments': '60/min',
+    },
 }
 
 SIMPLE_JWT = {
@@ -150,3 +187,43 @@ LIMIT_CODE = 256
 LIMIT_EMAIL = 254
 
 LIMIT_ROLE = 100
+
+LIMIT_BULK_TITLES = 1000
+
+LIMIT_LATEST_TITLES = 100
+
+LIMIT_LATEST_REVIEWS = 10
+
+LIMIT_LEADERBOARD_PAGE = 100
+
+LEADERBOARD_MIN_REVIEWS = 1
+
+EXPORT_CHUNK_SIZE = 2000
+
+IMPORT_BATCH_SIZE = 5000
+
+# Процессы разбора CSV при импорте; None - по числу ядер.
+IMPORT_WORKERS = None
+
+USER_CACHE_SIZE = 10000
+
+USER_CACHE_TIMEOUT = 60
+
+# Очередь писем: размер порции, попытки и паузы между ними (секунды).
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+
+EMAIL_OUTBOX_RETRY_DELAY = 30
+
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+
+EMAIL_OUTBOX_LEASE = 300
+
+EMAIL_OUTBOX_POLL_INTERVAL = 1
+
+# Сколько хранятся отправленные и отброшенные письма и как часто send_emails
+# их удаляет (секунды).
+EMAIL_OUTBOX_RETENTION = 7 * 24 * 3600
+
+EMAIL_OUTBOX_PURGE_INTERVAL = 3600
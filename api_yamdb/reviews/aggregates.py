@@ -0,0 +1,66 @@
+from django.db.models import (Count, F, IntegerField, OuterRef, Subquery,
+                              Sum)
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Review, Title, TitleScore
+
+SCORES_BATCH_SIZE = 1000
+
+
+def _related_subquery(model, field, aggregate):
+    """Подзапрос с агрегатом по строкам model, ссылающимся через field
+    на объект внешнего запроса."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(value=aggregate)
+            .values('value'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def rebuild_title_ratings():
+    """Пересчитывает сумму оценок и число отзывов всех произведений
+    одним UPDATE. Возвращает количество обновленных произведений."""
+    return Title.objects.update(
+        score_sum=_related_subquery(Review, 'title', Sum('score')),
+        review_count=_related_subquery(Review, 'title', Count('id')),
+    )
+
+
+def rebuild_comment_counts():
+    """Исправляет расхождения числа комментариев отзывов одним UPDATE.
+    Возвращает количество исправленных отзывов."""
+    comment_count = _related_subquery(Comment, 'review', Count('id'))
+    return Review.objects.exclude(
+        comment_count=comment_count
+    ).update(comment_count=comment_count)
+
+
+def add_title_score(title_id, score, delta):
+    """Меняет на delta столбец гистограммы оценок произведения.
+    Столбец создается при первом отзыве с этой оценкой."""
+    buckets = TitleScore.objects.filter(title_id=title_id, score=score)
+    if buckets.update(count=F('count') + delta) or delta < 0:
+        return
+    # ignore_conflicts: столбец мог успеть создать параллельный запрос.
+    TitleScore.objects.bulk_create(
+        [TitleScore(title_id=title_id, score=score)], ignore_conflicts=True)
+    buckets.update(count=F('count') + delta)
+
+
+def rebuild_title_scores():
+    """Пересобирает гистограммы оценок всех произведений одной
+    группировкой отзывов. Возвращает количество столбцов."""
+    TitleScore.objects.all().delete()
+    return len(TitleScore.objects.bulk_create(
+        (TitleScore(title_id=row['title'], score=row['score'],
+                    count=row['count'])
+         for row in Review.objects.order_by().values('title', 'score')
+         .annotate(count=Count('id')).iterator()),
+        batch_size=SCORES_BATCH_SIZE,
+    ))
@@ -0,0 +1,84 @@
+"""
+Материализованные рейтинги произведений (LeaderboardEntry).
+
+У произведения с отзывами есть строка общего рейтинга, строка рейтинга
+его категории и по строке на каждый жанр. Оценки и число отзывов
+обновляются при записи отзывов, состав строк - при изменении категории
+или жанров произведения.
+"""
+from collections import defaultdict
+
+from .models import LeaderboardEntry, Title, TitleGenre
+
+LEADERBOARD_BATCH_SIZE = 1000
+
+
+def rated_titles(**filters):
+    """Поля произведений с отзывами, нужные для строк рейтингов."""
+    return list(Title.objects.filter(
+        review_count__gt=0, **filters
+    ).order_by().values('id', 'category_id', 'score_sum', 'review_count'))
+
+
+def leaderboard_entries(titles):
+    """Строки рейтингов для строк rated_titles()."""
+    genres = defaultdict(list)
+    for title_id, genre_id in TitleGenre.objects.filter(
+        title_id__in=[title['id'] for title in titles]
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    for title in titles:
+        values = {
+            'title_id': title['id'],
+            'rating': title['score_sum'] / title['review_count'],
+            'review_count': title['review_count'],
+        }
+        yield LeaderboardEntry(**values)
+        if title['category_id'] is not None:
+            yield LeaderboardEntry(category_id=title['category_id'], **values)
+        for genre_id in dict.fromkeys(genres[title['id']]):
+            yield LeaderboardEntry(genre_id=genre_id, **values)
+
+
+def refresh_leaderboards(title_ids):
+    """Пересобирает строки рейтингов произведений: после смены категории
+    или жанров и после записи без сигналов (bulk_create, update)."""
+    entries = list(leaderboard_entries(rated_titles(pk__in=title_ids)))
+    # У произведений без отзывов строк нет: их удаляет
+    # update_title_leaderboards() вместе с последним отзывом.
+    if entries:
+        LeaderboardEntry.objects.filter(
+            title_id__in={entry.title_id for entry in entries}).delete()
+        LeaderboardEntry.objects.bulk_create(entries)
+
+
+def update_title_leaderboards(title_id):
+    """Переносит в рейтинги новые оценку и число отзывов произведения."""
+    titles = rated_titles(pk=title_id)
+    entries = LeaderboardEntry.objects.filter(title_id=title_id)
+    if not titles:
+        entries.delete()
+    elif not entries.update(
+        rating=titles[0]['score_sum'] / titles[0]['review_count'],
+        review_count=titles[0]['review_count'],
+    ):
+        # Первый отзыв: строк в рейтингах еще нет.
+        LeaderboardEntry.objects.bulk_create(leaderboard_entries(titles))
+
+
+def rebuild_leaderboards():
+    """Пересобирает все рейтинги по хранимым агрегатам произведений.
+    Возвращает количество строк."""
+    LeaderboardEntry.objects.all().delete()
+    count, last_pk = 0, 0
+    title_ids = Title.objects.filter(review_count__gt=0).order_by(
+        'pk').values_list('pk', flat=True)
+    while True:
+        batch = list(title_ids.filter(pk__gt=last_pk)[:LEADERBOARD_BATCH_SIZE])
+        if not batch:
+            return count
+        count += len(LeaderboardEntry.objects.bulk_create(
+            leaderboard_entries(rated_titles(pk__in=batch)),
+            batch_size=LEADERBOARD_BATCH_SIZE,
+        ))
+        last_pk = batch[-1]
@@ -0,0 +1,83 @@
+# Generated by Django 3.2 on 2026-10-18 02:44
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Полнотекстовый индекс по названию и описанию произведений. Таблица FTS5
+# ссылается на reviews_title (external content), триггеры поддерживают
+# индекс при любой записи, включая bulk_create и QuerySet.update().
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(reviews_title_fts, rowid, name,
+                                      description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+]
+
+
+def create_title_fts(apps, schema_editor):
+    # FTS5 есть только в SQLite; на других СУБД поиск работает через
+    # icontains, а SQLite без модуля fts5 оставляем без индекса.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(CREATE_FTS[0])
+    except OperationalError:
+        return
+    for statement in CREATE_FTS[1:]:
+        schema_editor.execute(statement)
+
+
+def drop_title_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_FTS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_review_comment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_title_fts, drop_title_fts),
+    ]
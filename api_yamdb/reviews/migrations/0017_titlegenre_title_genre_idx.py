@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_title_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='titlegenre',
+            index=models.Index(fields=['title', 'genre'], name='titlegenre_title_genre_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 3.2 on 2026-10-18 03:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_leaderboards(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    LeaderboardEntry = apps.get_model('reviews', 'LeaderboardEntry')
+    values = {
+        title['id']: (title['category_id'], {
+            'title_id': title['id'],
+            'rating': title['score_sum'] / title['review_count'],
+            'review_count': title['review_count'],
+        })
+        for title in Title.objects.filter(review_count__gt=0).values(
+            'id', 'category_id', 'score_sum', 'review_count').iterator()
+    }
+    entries = []
+    for category_id, title in values.values():
+        entries.append(LeaderboardEntry(**title))
+        if category_id is not None:
+            entries.append(LeaderboardEntry(category_id=category_id, **title))
+    for title_id, genre_id in TitleGenre.objects.values_list(
+            'title_id', 'genre_id').distinct().iterator():
+        if title_id in values:
+            entries.append(
+                LeaderboardEntry(genre_id=genre_id, **values[title_id][1]))
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0019_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(verbose_name='Рейтинг')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.category')),
+                ('genre', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Строка рейтинга произведений',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['category', 'genre', '-rating', '-review_count', 'title'], name='leaderboard_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['category', 'genre', '-review_count', '-rating', 'title'], name='leaderboard_reviews_idx'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
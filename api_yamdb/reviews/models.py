@@ -1,5 +1,5 @@
 from django.core.validators import (MaxValueValidator, MinValueValidator)
-from django.db import models
+from django.db import models, transaction
 
 from api_yamdb.settings import MAX_NAME, MAX_SLUG
 from users.models import User
@@ -31,13 +31,41 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class AggregatesModel(models.Model):
+    """Модель с хранимыми счетчиками из AGGREGATE_FIELDS."""
+    AGGREGATE_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # Агрегаты меняются только UPDATE с F(): не затираем их значениями
+        # из возможно устаревшего экземпляра.
+        # Отложенные поля, как и в Model.save(), не сохраняются.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.AGGREGATE_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Title(AggregatesModel):
     name = models.CharField('Произведение', max_length=MAX_NAME)
     year = models.IntegerField('Дата издания',)
     category = models.ForeignKey(
         Category, on_delete=models.SET_NULL, related_name='titles', null=True)
     genre = models.ManyToManyField(Genre, through='TitleGenre')
     description = models.TextField('Описание', blank=True, null=True)
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок', default=0, editable=False)
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0, editable=False)
+
+    AGGREGATE_FIELDS = ('score_sum', 'review_count')
 
     class Meta:
         ordering = ['name']
@@ -47,8 +75,15 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка по хранимым агрегатам отзывов."""
+        if not self.review_count:
+            return None
+        return self.score_sum / self.review_count
+
 
-class Review(models.Model):
+class Review(AggregatesModel):
     title = models.ForeignKey(Title, on_delete=models.CASCADE,
                               related_name='reviews')
     author = models.ForeignKey(
@@ -59,9 +94,19 @@ class Review(models.Model):
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
     text = models.TextField()
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False)
+
+    AGGREGATE_FIELDS = ('comment_count',)
 
     class Meta:
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(fields=['title', 'pub_date', 'id'],
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=['pub_date', 'id'],
+                         name='review_pub_date_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title', ],
@@ -72,6 +117,83 @@ class Review(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        # Агрегаты произведения обновляются в post_save той же транзакцией.
+        with transaction.atomic():
+            if (not self._state.adding
+                    and 'score' not in self.get_deferred_fields()):
+                # Разница оценок считается от сохраненной в БД, а не от
+                # прочитанной при загрузке: ее мог изменить параллельный
+                # запрос.
+                self._saved_score = self.locked().values_list(
+                    'score', flat=True).first()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        # post_delete отправляется, даже если строку уже удалил
+        # параллельный запрос: тогда агрегаты уменьшились бы дважды.
+        with transaction.atomic():
+            score = self.locked().values_list('score', flat=True).first()
+            if score is None:
+                return 0, {}
+            self._saved_score = score
+            return super().delete(*args, **kwargs)
+
+    def locked(self):
+        """Строка отзыва, заблокированная до конца транзакции."""
+        return Review.objects.select_for_update().filter(pk=self.pk)
+
+
+class TitleScore(models.Model):
+    """Столбец гистограммы оценок: число отзывов произведения с оценкой."""
+    title = models.ForeignKey(Title, on_delete=models.CASCADE,
+                              related_name='scores')
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Число отзывов', default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score'
+            )
+        ]
+        verbose_name = 'Оценки произведения'
+        verbose_name_plural = 'Оценки произведений'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Строка материализованного рейтинга произведений с отзывами: общего
+    (без категории и жанра), по категории или по жанру.
+    """
+    title = models.ForeignKey(Title, on_delete=models.CASCADE,
+                              related_name='leaderboard_entries')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE,
+                                 null=True, related_name='+')
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE,
+                              null=True, related_name='+')
+    rating = models.FloatField('Рейтинг')
+    review_count = models.PositiveIntegerField('Количество отзывов')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'genre', '-rating',
+                                 '-review_count', 'title'],
+                         name='leaderboard_rating_idx'),
+            models.Index(fields=['category', 'genre', '-review_count',
+                                 '-rating', 'title'],
+                         name='leaderboard_reviews_idx'),
+        ]
+        verbose_name = 'Строка рейтинга произведений'
+        verbose_name_plural = 'Рейтинги произведений'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.rating:.2f} ({self.review_count})'
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -83,16 +205,79 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('pub_date',)
+        indexes = [
+            models.Index(fields=['review', 'pub_date', 'id'],
+                         name='comment_review_pub_date_idx'),
+            models.Index(fields=['pub_date', 'id'],
+                         name='comment_pub_date_idx'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        # Счетчик комментариев отзыва обновляется в post_save той же
+        # транзакцией.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        # Как и Review.delete(): счетчик уменьшается, только если строка
+        # еще не удалена параллельным запросом.
+        with transaction.atomic():
+            if not Comment.objects.select_for_update().filter(
+                    pk=self.pk).exists():
+                return 0, {}
+            return super().delete(*args, **kwargs)
+
 
 class TitleGenre(models.Model):
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['title', 'genre'],
+                         name='titlegenre_title_genre_idx'),
+        ]
+
     def __str__(self):
         return f'{self.title} {self.genre}'
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Позиция импорта CSV-файла (import_data_csv): сколько строк и байт
+    файла уже зафиксировано в БД. С нее продолжает импорт --resume.
+    """
+    file = models.CharField('Файл', max_length=255, unique=True)
+    offset = models.BigIntegerField('Смещение, байт', default=0)
+    rows = models.PositiveIntegerField('Импортировано строк', default=0)
+    done = models.BooleanField('Импорт завершен', default=False)
+    updated = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Позиция импорта'
+        verbose_name_plural = 'Позиции импорта'
+
+    def __str__(self):
+        return f'{self.file}: {self.rows} ({self.offset} байт)'
+
+
+class CacheVersion(models.Model):
+    """
+    Версия данных для ETag и Last-Modified (api.cache): метка времени
+    последней записи в таблицу модели или в ее часть. Хранится в БД,
+    чтобы ее одинаково видели все процессы.
+    """
+    name = models.CharField('Имя', max_length=255, unique=True)
+    version = models.BigIntegerField('Версия, нс')
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
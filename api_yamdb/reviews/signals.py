@@ -0,0 +1,89 @@
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save)
+from django.dispatch import receiver
+
+from .aggregates import add_title_score
+from .leaderboards import refresh_leaderboards, update_title_leaderboards
+from .models import Comment, LeaderboardEntry, Review, Title
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """Запоминает сохраненную оценку, чтобы учесть ее изменение."""
+    # __dict__ вместо атрибута: отложенное поле не должно грузиться из БД.
+    instance._saved_score = instance.__dict__.get('score')
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, **kwargs):
+    saved_score, instance._saved_score = instance._saved_score, instance.score
+    if created:
+        Title.objects.filter(pk=instance.title_id).update(
+            score_sum=F('score_sum') + instance.score,
+            review_count=F('review_count') + 1,
+        )
+        add_title_score(instance.title_id, instance.score, 1)
+    elif saved_score not in (None, instance.score):
+        Title.objects.filter(pk=instance.title_id).update(
+            score_sum=F('score_sum') + instance.score - saved_score,
+        )
+        add_title_score(instance.title_id, saved_score, -1)
+        add_title_score(instance.title_id, instance.score, 1)
+    else:
+        return
+    update_title_leaderboards(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    score = instance._saved_score
+    if score is None:
+        score = instance.score
+    Title.objects.filter(pk=instance.title_id).update(
+        score_sum=F('score_sum') - score,
+        review_count=F('review_count') - 1,
+    )
+    add_title_score(instance.title_id, score, -1)
+    update_title_leaderboards(instance.title_id)
+
+
+@receiver(post_init, sender=Title)
+def remember_title_category(sender, instance, **kwargs):
+    instance._saved_category_id = instance.__dict__.get('category_id')
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_leaderboards(sender, instance, created, **kwargs):
+    # У нового произведения нет отзывов: рейтинги меняет только смена
+    # категории у существующего.
+    saved_category_id = instance._saved_category_id
+    instance._saved_category_id = instance.category_id
+    if not created and saved_category_id != instance.category_id:
+        refresh_leaderboards([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_genre_leaderboards(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        refresh_leaderboards([instance.pk])
+    elif action == 'post_clear':
+        LeaderboardEntry.objects.filter(genre=instance).delete()
+    else:
+        refresh_leaderboards(pk_set)
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, created, **kwargs):
+    if created:
+        Review.objects.filter(pk=instance.review_id).update(
+            comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1)
@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 03:35
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def fill_username_lower(apps, schema_editor):
+    # str.lower(), а не LOWER() базы: SQLite меняет регистр только ASCII.
+    User = apps.get_model('users', 'User')
+    users = User.objects.only('username').order_by('pk')
+    batch = []
+    for user in users.iterator(chunk_size=BATCH_SIZE):
+        user.username_lower = user.username.lower()
+        batch.append(user)
+        if len(batch) == BATCH_SIZE:
+            User.objects.bulk_update(batch, ['username_lower'])
+            batch = []
+    User.objects.bulk_update(batch, ['username_lower'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='username_lower',
+            field=models.CharField(default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_username_lower, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['username_lower', 'username'], name='user_username_lower_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.utils import timezone
 
 USER_ROLE = 'user'
 ADMIN_ROLE = 'admin'
@@ -32,11 +33,28 @@ class User(AbstractUser):
         },
     )
 
+    # username в нижнем регистре для поиска по префиксу без учета регистра.
+    username_lower = models.CharField(
+        max_length=150, default='', editable=False)
+
     bio = models.TextField(blank=True, null=True)
     role = models.CharField(max_length=128, choices=ROLES, default=USER_ROLE)
 
     class Meta:
         ordering = ['-username']
+        indexes = [
+            # Диапазон по префиксу и сортировка найденных без отдельного
+            # шага сортировки.
+            models.Index(fields=['username_lower', 'username'],
+                         name='user_username_lower_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.username_lower = self.username.lower()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'username' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'username_lower'}
+        super().save(*args, **kwargs)
 
     @property
     def is_admin(self):
@@ -45,3 +63,33 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == MODERATOR_ROLE
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в транзакционной очереди (outbox). Записывается в транзакции
+    запроса и отправляется фоновым обработчиком (команда send_emails).
+    """
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipient = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now, null=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent = models.DateTimeField('Отправлено', null=True)
+
+    class Meta:
+        indexes = [
+            # Очередь: только неотправленные письма с назначенной попыткой.
+            models.Index(
+                fields=['next_attempt'], name='outgoing_email_pending_idx',
+                condition=models.Q(sent=None, next_attempt__isnull=False)),
+        ]
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,116 @@
+"""
+Транзакционная очередь писем (outbox).
+
+enqueue_email() записывает письмо в таблицу в текущей транзакции, так что
+ответ на запрос не ждет почтовый сервер. deliver_pending() отправляет
+очередную порцию через одно соединение почтового бэкенда; неудачные
+письма повторяются с экспоненциально растущей паузой, после
+EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо остается с ошибкой.
+
+Текст письма содержит код подтверждения, поэтому у отправленных и
+отброшенных писем он стирается сразу, а сами строки удаляет
+purge_finished() через EMAIL_OUTBOX_RETENTION.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: удваивается с каждой неудачей."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY,
+    ))
+
+
+def claim_pending(batch_size):
+    """
+    Забирает до batch_size писем, чья попытка наступила. Письмо
+    откладывается на EMAIL_OUTBOX_LEASE секунд условным UPDATE: если его
+    уже забрал другой обработчик, UPDATE не изменит строку.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    pending = OutgoingEmail.objects.filter(
+        sent=None, next_attempt__lte=now).order_by('next_attempt')
+    return [
+        email for email in pending[:batch_size]
+        if OutgoingEmail.objects.filter(
+            pk=email.pk, next_attempt=email.next_attempt
+        ).update(next_attempt=lease)
+    ]
+
+
+def send_batch(emails):
+    """Отправляет письма через одно соединение. Возвращает id
+    отправленных и пары (письмо, ошибка) для неудачных."""
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        return [], [(email, error) for email in emails]
+    sent, failed = [], []
+    try:
+        for email in emails:
+            try:
+                EmailMessage(
+                    subject=email.subject, body=email.body,
+                    from_email=email.from_email, to=[email.recipient],
+                    connection=connection,
+                ).send()
+            except Exception as error:
+                failed.append((email, error))
+            else:
+                sent.append(email.pk)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет порцию писем из очереди. Возвращает число
+    отправленных и неудачных."""
+    emails = claim_pending(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+    sent, failed = send_batch(emails)
+    now = timezone.now()
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        sent=now, next_attempt=None, body='')
+    for email, error in failed:
+        email.attempts += 1
+        email.last_error = repr(error)
+        if email.attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.next_attempt = now + retry_delay(email.attempts)
+        else:
+            email.next_attempt = None
+            email.body = ''
+        email.save(update_fields=[
+            'attempts', 'last_error', 'next_attempt', 'body'])
+    return len(sent), len(failed)
+
+
+def purge_finished(retention=None):
+    """Удаляет отправленные и отброшенные письма старше retention
+    секунд (EMAIL_OUTBOX_RETENTION). Возвращает число удаленных."""
+    if retention is None:
+        retention = settings.EMAIL_OUTBOX_RETENTION
+    deleted, _ = OutgoingEmail.objects.filter(
+        next_attempt=None,
+        created__lt=timezone.now() - timedelta(seconds=retention),
+    ).delete()
+    return deleted
@@ -0,0 +1,91 @@
+"""Импорт CSV: последовательный разбор (--workers 0) против пула процессов
+на синтетическом наборе файлов.
+
+    python benchmarks/bench_import.py --rows 5000000 --workers 4
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+from io import StringIO
+
+from utils import report, setup_django
+
+SYLLABLES = ('ка', 'ро', 'ми', 'не', 'то', 'ла', 'вер', 'стан', 'дор', 'зи')
+PUB_DATE = '2020-01-13T23:20:02.422Z'
+
+
+def write_csv(directory, name, header, rows):
+    with open(os.path.join(directory, name), 'w', encoding='utf-8',
+              newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate(directory, total):
+    """Файлы MODELS_CSV примерно на total строк: половина - отзывы,
+    треть - комментарии."""
+    rnd = random.Random(0)
+
+    def text(words):
+        return ' '.join(''.join(rnd.choices(SYLLABLES, k=3))
+                        for _ in range(words))
+
+    users = max(total // 25, 100)
+    titles = max(total // 50, 10)
+    reviews = total // 2
+    comments = total // 3
+    write_csv(directory, 'users.csv',
+              ('id', 'username', 'email', 'role', 'bio', 'first_name',
+               'last_name'),
+              ((idx, f'user{idx}', f'user{idx}@yamdb.fake', 'user', '', '',
+                '') for idx in range(1, users + 1)))
+    write_csv(directory, 'category.csv', ('id', 'name', 'slug'),
+              ((idx, f'Категория {idx}', f'category{idx}')
+               for idx in range(1, 11)))
+    write_csv(directory, 'genre.csv', ('id', 'name', 'slug'),
+              ((idx, f'Жанр {idx}', f'genre{idx}') for idx in range(1, 51)))
+    write_csv(directory, 'titles.csv', ('id', 'name', 'year', 'category'),
+              ((idx, text(3).capitalize(), rnd.randint(1900, 2020),
+                idx % 10 + 1) for idx in range(1, titles + 1)))
+    write_csv(directory, 'genre_title.csv', ('id', 'title_id', 'genre_id'),
+              ((idx, (idx - 1) // 2 + 1, idx % 50 + 1)
+               for idx in range(1, titles * 2 + 1)))
+    # Автор и произведение отзыва образуют уникальную пару.
+    write_csv(directory, 'review.csv',
+              ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+              ((idx, idx % titles + 1, text(12), idx // titles + 1,
+                rnd.randint(1, 10), PUB_DATE)
+               for idx in range(1, reviews + 1)))
+    write_csv(directory, 'comments.csv',
+              ('id', 'review_id', 'text', 'author', 'pub_date'),
+              ((idx, rnd.randint(1, reviews), text(6),
+                rnd.randint(1, users), PUB_DATE)
+               for idx in range(1, comments + 1)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    setup_django()
+
+    from django.core.management import call_command
+
+    with tempfile.TemporaryDirectory() as directory:
+        with report(f'Генерация {args.rows} строк'):
+            generate(directory, args.rows)
+        for workers in (0, args.workers):
+            call_command('flush', interactive=False)
+            out = StringIO()
+            with report(f'Импорт, процессов разбора: {workers or 1}'):
+                call_command('import_data_csv', '--path', directory,
+                             '--workers', str(workers), stdout=out)
+            print(out.getvalue())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Рендеринг и разбор JSON: JSONRenderer/JSONParser против orjson.
+
+    python benchmarks/bench_renderers.py --items 10 100 1000
+"""
+import argparse
+import datetime as dt
+from io import BytesIO
+
+from utils import measure, setup_django
+
+
+def title_page(size):
+    return {
+        'count': size, 'next': None, 'previous': None,
+        'results': [{
+            'id': idx, 'name': f'Произведение {idx}', 'year': 1984,
+            'rating': idx % 10 or None,
+            'description': 'Описание произведения на русском языке',
+            'genre': [{'name': 'Драма', 'slug': 'drama'},
+                      {'name': 'Комедия', 'slug': 'comedy'}],
+            'category': {'name': 'Фильм', 'slug': 'films'},
+        } for idx in range(size)],
+    }
+
+
+def review_page(size):
+    pub_date = dt.datetime(2023, 5, 17, 16, 16, tzinfo=dt.timezone.utc)
+    return {
+        'count': size, 'next': None, 'previous': None,
+        'results': [{
+            'author': f'user{idx}', 'id': idx, 'pub_date': pub_date,
+            'text': 'Текст отзыва ' * 20, 'score': idx % 10 + 1,
+        } for idx in range(size)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', nargs='+', type=int,
+                        default=[10, 100, 1000])
+    args = parser.parse_args()
+    setup_django()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api.parsers import FastJSONParser
+    from api.renderers import FastJSONRenderer, orjson
+
+    if orjson is None:
+        print('orjson не установлен: FastJSONRenderer работает на json.')
+    for size in args.items:
+        for name, page in (('titles', title_page(size)),
+                           ('reviews', review_page(size))):
+            body = JSONRenderer().render(page)
+            results = []
+            for renderer, json_parser in ((JSONRenderer(), JSONParser()),
+                                          (FastJSONRenderer(),
+                                           FastJSONParser())):
+                results.append((
+                    measure(lambda: renderer.render(page), repeat=50),
+                    measure(lambda: json_parser.parse(BytesIO(body)),
+                            repeat=50),
+                ))
+            (render, parse), (fast_render, fast_parse) = results
+            print(f'{name:>8} x{size:<5}: рендеринг {render:.3f} -> '
+                  f'{fast_render:.3f} мс, разбор {parse:.3f} -> '
+                  f'{fast_parse:.3f} мс')
+
+
+if __name__ == '__main__':
+    main()
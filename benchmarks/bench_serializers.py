@@ -0,0 +1,66 @@
+"""Сериализация страниц: поля DRF против строк values().
+
+    python benchmarks/bench_serializers.py --pages 100 1000
+"""
+import argparse
+
+from utils import measure, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', nargs='+', type=int, default=[100, 1000])
+    args = parser.parse_args()
+    setup_django()
+
+    from api.fast_serializers import (ReviewValuesSerializer,
+                                      TitleValuesSerializer)
+    from api.serializers import ReviewSerializer, TitleRetriveSerializer
+    from reviews.models import Category, Genre, Review, Title, TitleGenre
+    from users.models import User
+
+    size = max(args.pages)
+    category = Category.objects.create(name='Фильм', slug='films')
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(5))
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category,
+              description='Описание произведения', score_sum=idx,
+              review_count=idx % 7)
+        for idx in range(size)
+    )
+    titles = list(Title.objects.all())
+    TitleGenre.objects.bulk_create(
+        TitleGenre(title=title, genre=genres[idx % len(genres) - offset])
+        for idx, title in enumerate(titles) for offset in range(2)
+    )
+    User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(size)
+    )
+    Review.objects.bulk_create(
+        Review(title=titles[0], author=user, score=5, text='Текст отзыва')
+        for user in User.objects.all()
+    )
+
+    cases = (
+        ('titles', TitleRetriveSerializer, TitleValuesSerializer,
+         Title.objects.select_related('category').prefetch_related('genre')
+         .order_by('pk')),
+        ('reviews', ReviewSerializer, ReviewValuesSerializer,
+         Review.objects.select_related('author').order_by('pk')),
+    )
+    for page in sorted(args.pages):
+        for name, serializer_class, values_class, queryset in cases:
+            drf = measure(lambda: serializer_class(
+                queryset.all()[:page], many=True).data)
+            values_serializer = values_class()
+            values = measure(lambda: values_serializer.serialize(
+                values_serializer.prepare(queryset.all())[:page]))
+            print(f'{name:>8} x{page:<5}: DRF {drf:.2f} мс, '
+                  f'values {values:.2f} мс ({drf / values:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
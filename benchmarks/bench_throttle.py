@@ -0,0 +1,64 @@
+"""Стоимость проверки частоты: TokenBucketThrottle против
+ScopedRateThrottle (история запросов в кэше).
+
+    python benchmarks/bench_throttle.py --clients 1 100 10000
+"""
+import argparse
+
+from utils import measure, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', nargs='+', type=int,
+                        default=[1, 100, 10000])
+    parser.add_argument('--calls', type=int, default=1000)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import ScopedRateThrottle
+
+    from api.throttling import TokenBucketThrottle
+
+    class View:
+        throttle_scope = 'bench'
+
+    factory = APIRequestFactory()
+    rates = {'bench': '100000/min'}
+    with override_settings(REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': rates}):
+        ScopedRateThrottle.THROTTLE_RATES = rates
+        for clients in args.clients:
+            requests = []
+            for idx in range(clients):
+                request = Request(factory.post(
+                    '/', REMOTE_ADDR=f'10.{idx >> 16}.{idx >> 8 & 255}.'
+                                     f'{idx & 255}'))
+                request.user = AnonymousUser()
+                requests.append(request)
+            results = []
+            for throttle_class in (ScopedRateThrottle, TokenBucketThrottle):
+                cache.clear()
+
+                def check():
+                    for idx in range(args.calls):
+                        throttle_class().allow_request(
+                            requests[idx % clients], View())
+
+                with CaptureQueriesContext(connection) as queries:
+                    check()
+                results.append((measure(check, repeat=5), len(queries)))
+            (scoped, _), (bucket, bucket_queries) = results
+            print(f'клиентов {clients:<6}: ScopedRateThrottle '
+                  f'{scoped * 1000 / args.calls:.1f} мкс, TokenBucket '
+                  f'{bucket * 1000 / args.calls:.1f} мкс на проверку, '
+                  f'запросов к БД: {bucket_queries}')
+
+
+if __name__ == '__main__':
+    main()
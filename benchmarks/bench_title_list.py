@@ -0,0 +1,84 @@
+"""Время ответа /api/v1/titles/ в зависимости от числа отзывов.
+
+Сравнивает хранимый рейтинг с прежней агрегацией Avg('reviews__score')
+на каждом запросе:
+    python benchmarks/bench_title_list.py --sizes 10000 100000 1000000
+"""
+import argparse
+
+from utils import clear_cache, measure, report, setup_django
+
+TITLES = 1000
+BATCH_SIZE = 10000
+
+
+def grow_reviews(target, created):
+    from reviews.models import Review, Title
+    from users.models import User
+
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    users_needed = -(-target // len(title_ids))
+    users = User.objects.count()
+    User.objects.bulk_create(
+        User(username=f'user{idx}', email=f'user{idx}@yamdb.fake')
+        for idx in range(users, users_needed)
+    )
+    user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+    batch = []
+    for idx in range(created, target):
+        batch.append(Review(
+            title_id=title_ids[idx % len(title_ids)],
+            author_id=user_ids[idx // len(title_ids)],
+            score=idx % 10 + 1,
+            text='Отзыв',
+        ))
+        if len(batch) == BATCH_SIZE:
+            Review.objects.bulk_create(batch)
+            batch = []
+    Review.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+    setup_django()
+
+    from django.db.models import Avg
+    from rest_framework.test import APIClient
+
+    from api.serializers import TitleRetriveSerializer
+    from reviews.aggregates import rebuild_title_ratings
+    from reviews.models import Title
+
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000) for idx in range(TITLES)
+    )
+    client = APIClient()
+
+    def legacy_page():
+        # Прежний queryset; аннотация переименована, чтобы не конфликтовать
+        # со свойством Title.rating.
+        queryset = Title.objects.annotate(
+            legacy_rating=Avg('reviews__score')).order_by('pk')
+        queryset.count()
+        TitleRetriveSerializer(queryset[:10], many=True).data
+
+    created = 0
+    for size in sorted(args.sizes):
+        with report(f'Подготовка {size} отзывов'):
+            grow_reviews(size, created)
+            rebuild_title_ratings()
+        created = size
+        # bulk_create и rebuild_title_ratings не меняют версии кэша:
+        # без очистки замерялся бы ответ из кэша.
+        stored = measure(lambda: client.get('/api/v1/titles/'),
+                         setup=clear_cache)
+        legacy = measure(legacy_page, repeat=5)
+        print(f'{size:>8} отзывов: хранимый рейтинг {stored:.2f} мс, '
+              f'Avg на запросе {legacy:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Поиск произведений: FTS5 (?search=) против icontains (?name=).
+
+    python benchmarks/bench_title_search.py --titles 100000
+"""
+import argparse
+import random
+
+from utils import clear_cache, measure, report, setup_django
+
+SYLLABLES = ('ка', 'ро', 'ми', 'не', 'то', 'ла', 'вер', 'стан', 'дор', 'зи',
+             'лу', 'ше', 'гра', 'по', 'ёж', 'ны')
+QUERIES = ('Звезда', 'остров', 'тень свет', 'песн', 'карони')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=100000)
+    args = parser.parse_args()
+    setup_django()
+
+    from rest_framework.test import APIClient
+
+    from reviews.models import Title
+
+    rnd = random.Random(0)
+    # Словарь из тысяч слов, чтобы запросы были избирательными, как
+    # в реальных названиях и описаниях.
+    words = [''.join(rnd.choices(SYLLABLES, k=rnd.randint(2, 4)))
+             for _ in range(20000)]
+    words += [query.lower() for query in QUERIES for _ in range(3)]
+    with report(f'Подготовка {args.titles} произведений'):
+        Title.objects.bulk_create(
+            (Title(name=' '.join(rnd.choices(words, k=3)).capitalize(),
+                   year=2000,
+                   description=' '.join(rnd.choices(words, k=20)))
+             for _ in range(args.titles)),
+            batch_size=5000,
+        )
+    client = APIClient()
+    for query in QUERIES:
+        fts = measure(
+            lambda: client.get('/api/v1/titles/', {'search': query}),
+            setup=clear_cache)
+        legacy = measure(
+            lambda: client.get('/api/v1/titles/', {'name': query}), repeat=5,
+            setup=clear_cache)
+        print(f'{query!r:>12}: search {fts:.2f} мс, icontains {legacy:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
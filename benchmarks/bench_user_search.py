@@ -0,0 +1,57 @@
+"""Поиск пользователей администратором: icontains (?search=) против
+префикса по индексу username_lower (?username=) и поиска по ?email=.
+
+    python benchmarks/bench_user_search.py --users 1000000
+"""
+import argparse
+import random
+import string
+
+from utils import measure, report, setup_django
+
+QUERIES = ('ma', 'Mar', 'marko', 'zzz')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=1000000)
+    args = parser.parse_args()
+    setup_django()
+
+    from rest_framework.test import APIClient
+
+    from users.models import ADMIN_ROLE, User
+
+    rnd = random.Random(0)
+    letters = string.ascii_letters + string.digits
+    with report(f'Подготовка {args.users} пользователей'):
+        names = set()
+        while len(names) < args.users:
+            names.add(''.join(rnd.choices(letters, k=rnd.randint(6, 12))))
+        User.objects.bulk_create(
+            (User(username=name, username_lower=name.lower(),
+                  email=f'{name}@yamdb.fake')
+             for name in names),
+            batch_size=5000,
+        )
+    admin = User.objects.create(username='bench_admin', role=ADMIN_ROLE,
+                                email='bench_admin@yamdb.fake')
+    client = APIClient()
+    client.force_authenticate(admin)
+    url = '/api/v1/users/'
+    for query in QUERIES:
+        prefix = measure(
+            lambda: client.get(url, {'username': query, 'cursor': ''}))
+        prefix_count = measure(lambda: client.get(url, {'username': query}))
+        contains = measure(
+            lambda: client.get(url, {'search': query, 'cursor': ''}),
+            repeat=3)
+        print(f'{query!r:>8}: username {prefix:.2f} мс (с COUNT '
+              f'{prefix_count:.2f} мс), search {contains:.2f} мс')
+    email = f'{rnd.choice(sorted(names))}@yamdb.fake'
+    print(f'email: {measure(lambda: client.get(url, {"email": email})):.2f} '
+          'мс')
+
+
+if __name__ == '__main__':
+    main()
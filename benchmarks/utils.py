@@ -0,0 +1,54 @@
+"""Общая подготовка окружения для бенчмарков.
+
+Бенчмарки запускаются из корня репозитория, например:
+    python benchmarks/bench_title_list.py
+и работают на временной тестовой базе, не затрагивая db.sqlite3.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb'
+
+
+def setup_django():
+    """Настраивает Django и создает тестовую базу с миграциями."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, keepdb=False)
+
+
+def measure(func, repeat=20, setup=None):
+    """Возвращает медианное время вызова func в миллисекундах. setup
+    вызывается перед каждым вызовом и в замер не входит."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def clear_cache():
+    """Очищает кэш ответов API, чтобы замерялся запрос к БД, а не кэш."""
+    from django.core.cache import cache
+    cache.clear()
+
+
+@contextmanager
+def report(title):
+    started = time.perf_counter()
+    yield
+    print(f'{title}: {time.perf_counter() - started:.2f} с')
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+def get_rating(client, title_id):
+    response = client.get(f'/api/v1/titles/{title_id}/')
+    assert response.status_code == HTTPStatus.OK
+    return response.json()['rating']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, client, admin_client, user,
+                                       user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert get_rating(client, title_id) is None, (
+            'Проверьте, что у произведения без отзывов `rating` равен None.'
+        )
+
+        create_single_review(user_client, title_id, 'Отзыв', 4)
+        review = create_single_review(
+            moderator_client, title_id, 'Отзыв', 9
+        ).json()
+        assert get_rating(client, title_id) == 6, (
+            'Проверьте, что `rating` пересчитывается при создании отзыва.'
+        )
+
+        moderator_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 10}
+        )
+        assert get_rating(client, title_id) == 7, (
+            'Проверьте, что `rating` пересчитывается при изменении оценки.'
+        )
+
+        moderator_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        )
+        assert get_rating(client, title_id) == 4, (
+            'Проверьте, что `rating` пересчитывается при удалении отзыва.'
+        )
+
+        user.delete()
+        assert get_rating(client, title_id) is None, (
+            'Проверьте, что `rating` пересчитывается при каскадном удалении '
+            'отзывов вместе с автором.'
+        )
+
+    def test_02_stale_score(self, client, admin_client, user_client):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отзыв', 4).json()['id']
+        stale = Review.objects.get(pk=review_id)
+        fresh = Review.objects.get(pk=review_id)
+        fresh.score = 8
+        fresh.save()
+        stale.score = 6
+        stale.save()
+        assert get_rating(client, title_id) == 6, (
+            'Проверьте, что изменение оценки учитывает оценку, сохраненную '
+            'в БД, а не прочитанную при загрузке отзыва.'
+        )
+
+        stale.delete()
+        fresh.delete()
+        assert get_rating(client, title_id) is None
+
+    def test_03_rebuild_command(self, client, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 8)
+        Title.objects.update(score_sum=0, review_count=0)
+
+        call_command('rebuild_aggregates')
+        assert get_rating(client, title_id) == 8, (
+            'Проверьте, что команда `rebuild_aggregates` восстанавливает '
+            'хранимые агрегаты отзывов.'
+        )
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+
+
+def create_catalog(count):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    titles = []
+    for idx in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+@pytest.fixture
+def catalog(db):
+    return create_catalog(3)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+    url = '/api/v1/titles/'
+
+    @pytest.mark.parametrize('count', [1, 10])
+    def test_01_list(self, client, count, django_assert_num_queries):
+        create_catalog(count)
+        # Версии для ETag, COUNT, страница произведений с категориями,
+        # жанры страницы.
+        with django_assert_num_queries(4):
+            response = client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == count, (
+            'Проверьте, что число запросов к БД при получении списка '
+            'произведений не зависит от размера страницы.'
+        )
+
+    def test_02_retrieve(self, client, catalog, django_assert_num_queries):
+        # Версии для ETag вместе с проверкой произведения, произведение
+        # с категорией и его жанры.
+        with django_assert_num_queries(3):
+            response = client.get(f'{self.url}{catalog[0].pk}/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['genre']) == 2
+
+    def test_03_create(self, admin_client, catalog, admin,
+                       django_assert_num_queries):
+        data = {
+            'name': 'Новое произведение',
+            'year': 2001,
+            'genre': ['drama', 'comedy'],
+            'category': 'films',
+        }
+        # Пользователь, два жанра, категория, INSERT произведения,
+        # транзакция связей с жанрами (выборка, проверка и вставка),
+        # проверка рейтингов произведения, жанры для ответа, версии
+        # произведений и связей с жанрами (UPDATE и INSERT новых).
+        with django_assert_num_queries(13):
+            response = admin_client.post(self.url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(response.json()['genre']) == 2
+
+    def test_04_update(self, admin_client, catalog, admin,
+                       django_assert_num_queries):
+        url = f'{self.url}{catalog[0].pk}/'
+        # Пользователь, произведение с категорией и жанрами, UPDATE,
+        # жанры для ответа, версия произведений.
+        with django_assert_num_queries(6):
+            response = admin_client.patch(url, data={'name': 'Новое имя'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['category']['slug'] == 'films'
+        assert len(response.json()['genre']) == 2
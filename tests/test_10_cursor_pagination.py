@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+def walk_cursor_pages(client, url):
+    results = []
+    response = client.get(url, {'cursor': ''})
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            f'Проверьте, что курсорный режим `{url}?cursor=` не считает '
+            'общее количество объектов.'
+        )
+        results.extend(data['results'])
+        if not data['next']:
+            return results
+        response = client.get(data['next'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_titles(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {idx}', year=2000) for idx in range(25)
+        )
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        assert 'count' in response.json(), (
+            f'Проверьте, что без параметра `cursor` `{url}` сохраняет '
+            'постраничную пагинацию.'
+        )
+
+        ids = [title['id'] for title in walk_cursor_pages(client, url)]
+        assert ids == sorted(Title.objects.values_list('id', flat=True)), (
+            f'Проверьте, что курсорные страницы `{url}` возвращают все '
+            'произведения по порядку `id` без пропусков и повторов.'
+        )
+
+    def test_02_reviews(self, client, admin_client, admin, user_client,
+                        user, moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        results = walk_cursor_pages(client, url)
+        assert [review['id'] for review in results] == [
+            review['id'] for review in reviews
+        ], (
+            f'Проверьте, что курсорный режим `{url}` возвращает отзывы '
+            'в порядке публикации.'
+        )
@@ -0,0 +1,52 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+    url = '/api/v1/titles/'
+
+    def search(self, client, value):
+        response = client.get(self.url, {'search': value})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search(self, client):
+        from reviews.models import Title
+
+        Title.objects.create(name='Война и мир', year=1869,
+                             description='Роман Льва Толстого')
+        Title.objects.create(name='Мир полудня', year=1962,
+                             description='Цикл о войне будущего')
+        Title.objects.create(name='Пикник на обочине', year=1972)
+
+        assert sorted(self.search(client, 'ВОЙН')) == [
+            'Война и мир', 'Мир полудня'
+        ], (
+            f'Проверьте, что `{self.url}?search=` ищет по префиксу слова '
+            'без учета регистра в названии и описании.'
+        )
+        assert self.search(client, 'толст') == ['Война и мир'], (
+            f'Проверьте, что `{self.url}?search=` ищет по описанию.'
+        )
+        assert self.search(client, 'мир пикник') == [], (
+            f'Проверьте, что `{self.url}?search=` требует все слова запроса.'
+        )
+
+    def test_02_index_follows_changes(self, client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Солярис', year=1961)
+        title.name = 'Непобедимый'
+        title.save()
+        assert self.search(client, 'солярис') == []
+        assert self.search(client, 'непобед') == ['Непобедимый'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        title.delete()
+        assert self.search(client, 'непобед') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
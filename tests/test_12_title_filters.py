@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleFilters:
+    url = '/api/v1/titles/'
+
+    def names(self, client, params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_01_genre(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, {'genre': 'horror,comedy'}) == [
+            'Терминатор'
+        ], (
+            f'Проверьте, что `{self.url}?genre=a,b` возвращает произведение '
+            'с несколькими подходящими жанрами один раз.'
+        )
+        assert self.names(client, {'genre': 'horror,drama'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            f'Проверьте, что `{self.url}?genre=a,b` возвращает произведения '
+            'хотя бы с одним из жанров.'
+        )
+        assert self.names(
+            client, {'genre': 'horror,drama', 'genre_match': 'all'}
+        ) == [], (
+            f'Проверьте, что `{self.url}?genre=a,b&genre_match=all` '
+            'возвращает только произведения со всеми жанрами.'
+        )
+        assert self.names(client, {'genre': 'dram'}) == [], (
+            f'Проверьте, что `{self.url}?genre=` сравнивает slug точно.'
+        )
+        assert self.names(client, {'genre__icontains': 'o'}) == [
+            'Терминатор'
+        ], (
+            f'Проверьте, что `{self.url}?genre__icontains=` ищет подстроку '
+            'в slug жанра без повторов.'
+        )
+
+    def test_02_category(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, {'category': 'films,books'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.names(client, {'category': 'film'}) == []
+        assert self.names(client, {'category__icontains': 'film'}) == [
+            'Терминатор'
+        ]
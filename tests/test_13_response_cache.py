@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    def test_01_cached_list(self, client, admin_client,
+                            django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?genre=horror&category=films'
+        first = client.get(url)
+        # Только версии для ETag.
+        with django_assert_num_queries(1):
+            second = client.get('/api/v1/titles/?category=films&genre=horror')
+        assert second.status_code == HTTPStatus.OK
+        assert second.json() == first.json(), (
+            'Проверьте, что повторный запрос списка произведений с теми же '
+            'параметрами отдается из кэша.'
+        )
+
+    def test_02_invalidation(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что кэш произведения сбрасывается при создании '
+            'отзыва.'
+        )
+
+        admin_client.delete('/api/v1/genres/horror/')
+        genres = client.get(url).json()['genre']
+        assert [genre['slug'] for genre in genres] == ['comedy'], (
+            'Проверьте, что кэш произведения сбрасывается при удалении '
+            'жанра.'
+        )
+        response = client.get('/api/v1/genres/')
+        assert 'horror' not in [
+            genre['slug'] for genre in response.json()['results']
+        ], 'Проверьте, что кэш списка жанров сбрасывается при удалении.'
+
+    def test_03_other_process_write(self, client):
+        import time
+
+        from api.cache import store_versions, version_name
+        from reviews.models import Title
+
+        Title.objects.create(name='Первое', year=2000)
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['count'] == 1
+        # Запись в другом процессе: строка и версия в БД меняются, кэш
+        # ответов этого процесса - нет.
+        Title.objects.bulk_create([Title(name='Второе', year=2000)])
+        store_versions([version_name(Title)], time.time_ns())
+        response = client.get(url)
+        assert response.json()['count'] == 2, (
+            'Проверьте, что кэш ответов учитывает версии, измененные '
+            'другим процессом.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
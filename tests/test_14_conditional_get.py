@@ -0,0 +1,239 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.utils.http import http_date
+
+from tests.utils import create_comments, create_single_review
+
+
+def wait_next_second():
+    """Last-Modified отдается, когда секунда последней записи прошла."""
+    time.sleep(1 - time.time() % 1)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    def check_not_modified(self, client, url, django_assert_num_queries):
+        client.get(url)
+        wait_next_second()
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        assert response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ `{url}` содержит заголовок Last-Modified.'
+        )
+        # Единственный запрос проверяет, что ресурс существует.
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            'If-None-Match возвращает ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+        return etag
+
+    def test_01_reviews(self, client, admin_client, admin, user_client, user,
+                        moderator_client, moderator,
+                        django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        urls = (
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/comments/',
+        )
+        etags = [
+            self.check_not_modified(client, url, django_assert_num_queries)
+            for url in urls
+        ]
+
+        create_single_review(moderator_client, title_id, 'Отзыв', 3)
+        for url, etag in zip(urls[:2], etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что ETag `{url}` меняется после нового отзыва.'
+            )
+        response = client.get(urls[2], HTTP_IF_NONE_MATCH=etags[2])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что новый отзыв не меняет ETag комментариев к '
+            'другому отзыву.'
+        )
+
+        user_client.patch(
+            f'{urls[2]}{comments[1]["id"]}/', data={'text': 'Исправлено'}
+        )
+        response = client.get(urls[2], HTTP_IF_NONE_MATCH=etags[2])
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что ETag `{urls[2]}` меняется после изменения '
+            'комментария.'
+        )
+
+    def test_02_if_modified_since(self, client, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        client.get(url)
+        wait_next_second()
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что `{url}` учитывает заголовок If-Modified-Since.'
+        )
+
+    def test_03_same_second_write(self, client, admin_client, admin,
+                                  moderator_client, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        since = http_date(time.time())
+        client.get(url)
+        create_single_review(moderator_client, titles[0]['id'], 'Отзыв', 3)
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запись в ту же секунду, что и If-Modified-Since, '
+            'не дает ответа 304.'
+        )
+        if response.has_header('Last-Modified'):
+            assert response['Last-Modified'] != since, (
+                'Проверьте, что Last-Modified не раньше последней записи.'
+            )
+
+        client.get(url)
+        wait_next_second()
+        last_modified = client.get(url)['Last-Modified']
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после нового отзыва If-Modified-Since с прежним '
+            'Last-Modified не дает ответа 304.'
+        )
+
+    def test_04_missing_resource(self, client, admin_client, admin):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        future = http_date(time.time() + 3600)
+        title_id = titles[0]['id']
+        requests = (
+            ('/api/v1/titles/999999/', {'HTTP_IF_NONE_MATCH': '*'}),
+            ('/api/v1/titles/999999/reviews/',
+             {'HTTP_IF_MODIFIED_SINCE': future}),
+            (f'/api/v1/titles/{title_id}/reviews/999999/',
+             {'HTTP_IF_NONE_MATCH': '*'}),
+            (f'/api/v1/titles/{title_id}/reviews/999999/comments/',
+             {'HTTP_IF_MODIFIED_SINCE': future}),
+        )
+        for url, headers in requests:
+            response = client.get(url, **headers)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что условный GET-запрос к несуществующему '
+                f'`{url}` возвращает ответ со статусом 404.'
+            )
+        response = client.get(f'/api/v1/titles/{title_id}/',
+                              HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_05_shared_versions(self, client, admin_client, admin, user,
+                                user_client, django_user_model):
+        from django.core.cache import cache
+
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        urls = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+        )
+        etags = [client.get(url)['ETag'] for url in urls]
+        cache.clear()
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                'Проверьте, что версии для ETag хранятся не в кэше '
+                'процесса, а общие для всех процессов.'
+            )
+
+        django_user_model.objects.create(username='newcomer',
+                                         email='newcomer@yamdb.fake')
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                'Проверьте, что регистрация пользователя не меняет ETag '
+                'отзывов и комментариев.'
+            )
+
+        user.username = 'renamed'
+        user.save()
+        response = client.get(urls[0], HTTP_IF_NONE_MATCH=etags[0])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена username автора меняет ETag списков '
+            'с его записями.'
+        )
+        response = client.get(urls[1], HTTP_IF_NONE_MATCH=etags[1])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что смена username не меняет ETag списков без '
+            'записей пользователя.'
+        )
+
+    def test_06_title_detail_scope(self, client, admin_client, admin,
+                                   user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        first, second = (f'/api/v1/titles/{title["id"]}/'
+                         for title in titles[:2])
+        etags = {url: client.get(url)['ETag'] for url in (first, second)}
+
+        create_single_review(user_client, titles[1]['id'], 'Отзыв', 7)
+        response = client.get(first, HTTP_IF_NONE_MATCH=etags[first])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв на другое произведение не меняет ETag '
+            'произведения.'
+        )
+        response = client.get(second, HTTP_IF_NONE_MATCH=etags[second])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что отзыв на произведение меняет его ETag.'
+        )
+        assert response.json()['rating'] == 7
+
+    def test_07_cascade_bumps_once(self, admin_client, admin, user,
+                                   user_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import CacheVersion
+
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        with CaptureQueriesContext(connection) as context:
+            user.delete()
+        updates = [query for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE')
+                   and CacheVersion._meta.db_table in query['sql']]
+        assert len(updates) == 1, (
+            'Проверьте, что версии, отмеченные при каскадном удалении, '
+            'записываются одним запросом после фиксации транзакции.'
+        )
+
+    def test_08_rolled_back_bumps(self):
+        from django.db import transaction
+
+        from api.cache import bump_versions
+        from reviews.models import CacheVersion
+
+        with pytest.raises(ZeroDivisionError):
+            with transaction.atomic():
+                bump_versions('rolled_back')
+                1 / 0
+        with transaction.atomic():
+            bump_versions('committed')
+        assert list(CacheVersion.objects.values_list('name', flat=True)) == [
+            'committed'
+        ], (
+            'Проверьте, что версии отмечаются только в зафиксированных '
+            'транзакциях, а после отката - собираются заново.'
+        )
@@ -0,0 +1,51 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ValuesSerializers:
+
+    def check_same_output(self, serializer_class, values_serializer_class,
+                          queryset):
+        expected = JSONRenderer().render(
+            serializer_class(queryset, many=True).data
+        )
+        values_serializer = values_serializer_class()
+        actual = JSONRenderer().render(
+            values_serializer.serialize(values_serializer.prepare(queryset))
+        )
+        assert actual == expected, (
+            f'Проверьте, что {values_serializer_class.__name__} выдает тот '
+            f'же JSON, что и {serializer_class.__name__}.'
+        )
+
+    def test_01_same_output(self, admin_client, admin, user_client, user,
+                            moderator_client):
+        from api.fast_serializers import (CommentValuesSerializer,
+                                          ReviewValuesSerializer,
+                                          TitleValuesSerializer)
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitleRetriveSerializer)
+        from reviews.models import Comment, Review, Title
+
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        title = Title.objects.create(name='Без категории', year=2000,
+                                     description='Описание «в кавычках»')
+        create_single_review(user_client, title.pk, 'Текст\nс переносом', 4)
+        create_single_review(moderator_client, title.pk, 'Отзыв', 9)
+
+        self.check_same_output(
+            TitleRetriveSerializer, TitleValuesSerializer,
+            Title.objects.select_related('category')
+            .prefetch_related('genre').order_by('pk'),
+        )
+        self.check_same_output(
+            ReviewSerializer, ReviewValuesSerializer,
+            Review.objects.order_by('pk'),
+        )
+        self.check_same_output(
+            CommentSerializer, CommentValuesSerializer,
+            Comment.objects.order_by('pk'),
+        )
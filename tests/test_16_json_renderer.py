@@ -0,0 +1,47 @@
+import datetime as dt
+from collections import OrderedDict
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+PAYLOAD = OrderedDict([
+    ('name', 'Война и мир\u2028«Эпилог»'),
+    ('pub_date', dt.datetime(2023, 5, 17, 16, 16, 1, 123, tzinfo=timezone.utc)),
+    ('naive', dt.datetime(2023, 5, 17, 16, 16)),
+    ('day', dt.date(2023, 5, 17)),
+    ('score', Decimal('7.5')),
+    ('scores', {1: 2, 10: 0}),
+    ('genre', [{'slug': 'drama'}, None, True]),
+])
+
+
+class Test16JSONRenderer:
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_01_same_output(self, monkeypatch, use_orjson):
+        from api import renderers
+
+        if not use_orjson:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        assert renderers.FastJSONRenderer().render(PAYLOAD) == (
+            JSONRenderer().render(PAYLOAD)
+        ), (
+            'Проверьте, что FastJSONRenderer выдает тот же JSON, что и '
+            'JSONRenderer, с orjson и без него.'
+        )
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_02_parser(self, monkeypatch, use_orjson):
+        from api import parsers
+
+        if not use_orjson:
+            monkeypatch.setattr(parsers, 'orjson', None)
+        parser = parsers.FastJSONParser()
+        data = parser.parse(BytesIO('{"text": "Отзыв"}'.encode()))
+        assert data == {'text': 'Отзыв'}
+        with pytest.raises(ParseError):
+            parser.parse(BytesIO(b'{"text": NaN}'))
@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.fixture
+def catalog(db):
+    from reviews.models import Category, Genre
+
+    Category.objects.create(name='Фильм', slug='films')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleBulk:
+    url = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_create(self, admin_client, catalog,
+                            django_assert_max_num_queries):
+        from reviews.models import Title
+
+        Title.objects.create(name='Существующее', year=1999)
+        data = [
+            {'name': f'Произведение {idx}', 'year': 1970 + idx,
+             'genre': ['drama', 'comedy'], 'category': 'films'}
+            for idx in range(50)
+        ]
+        with django_assert_max_num_queries(20):
+            response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.url}` '
+            'создаёт произведения и возвращает статус 201.'
+        )
+        results = response.json()
+        assert [title['name'] for title in results] == [
+            item['name'] for item in data
+        ], (
+            f'Проверьте, что `{self.url}` возвращает созданные произведения '
+            'в порядке запроса.'
+        )
+        assert all(len(title['genre']) == 2 for title in results)
+        assert all(title['category']['slug'] == 'films' for title in results)
+        assert Title.objects.count() == 51
+        for title in results:
+            assert Title.objects.get(pk=title['id']).name == title['name'], (
+                'Проверьте, что созданные произведения возвращаются со '
+                'своими id.'
+            )
+        assert Title.objects.get(name='Существующее').genre.count() == 0
+
+    def test_02_bulk_errors(self, admin_client, catalog):
+        from reviews.models import Title
+
+        data = [
+            {'name': 'Верное', 'year': 2000, 'genre': ['drama'],
+             'category': 'films'},
+            {'name': 'Неверный жанр', 'year': 2000, 'genre': ['unknown'],
+             'category': 'films'},
+            {'name': 'Из будущего', 'year': 3000, 'genre': ['drama'],
+             'category': 'films'},
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == len(data) and not errors[0], (
+            f'Проверьте, что `{self.url}` возвращает ошибки списком '
+            'по элементам запроса.'
+        )
+        assert 'genre' in errors[1] and 'year' in errors[2]
+        assert not Title.objects.exists(), (
+            f'Проверьте, что при ошибке в одном элементе `{self.url}` '
+            'не создаёт ни одного произведения.'
+        )
+
+    def test_03_bulk_update(self, admin_client, catalog):
+        from reviews.models import Title
+
+        response = admin_client.post(
+            self.url,
+            data=[{'name': f'Старое {idx}', 'year': 2000,
+                   'genre': ['drama'], 'category': 'films'}
+                  for idx in range(3)],
+            format='json')
+        ids = [title['id'] for title in response.json()]
+        data = [
+            {'id': ids[0], 'name': 'Новое имя'},
+            {'id': ids[1], 'genre': ['comedy']},
+        ]
+        response = admin_client.patch(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что PATCH-запрос администратора к `{self.url}` '
+            'изменяет произведения и возвращает статус 200.'
+        )
+        first, second = response.json()
+        assert first['name'] == 'Новое имя'
+        assert [genre['slug'] for genre in first['genre']] == ['drama']
+        assert [genre['slug'] for genre in second['genre']] == ['comedy']
+        assert Title.objects.get(pk=ids[2]).name == 'Старое 2'
+
+        response = admin_client.patch(
+            self.url, data=[{'id': max(ids) + 1, 'name': 'Нет'}],
+            format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что PATCH-запрос к `{self.url}` с несуществующим '
+            '`id` возвращает статус 400.'
+        )
+
+        response = admin_client.patch(
+            self.url,
+            data=[{'id': ids[2], 'genre': ['comedy']},
+                  {'id': ids[2], 'genre': ['drama']}],
+            format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что PATCH-запрос к `{self.url}` с повторяющимся '
+            '`id` возвращает статус 400.'
+        )
+        errors = response.json()
+        assert not errors[0] and 'id' in errors[1], (
+            'Проверьте, что ошибка повторяющегося `id` относится к его '
+            'повтору.'
+        )
+        assert Title.objects.get(pk=ids[2]).genre.count() == 1
+
+    def test_04_bulk_permissions(self, client, user_client, catalog):
+        data = [{'name': 'Произведение', 'year': 2000, 'genre': ['drama'],
+                 'category': 'films'}]
+        response = client.post(self.url, data=data,
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.url}` доступен только администратору.'
+        )
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ReviewQueries:
+
+    @pytest.fixture
+    def comments(self, admin_client, admin, user_client, user,
+                 moderator_client, moderator):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        return create_comments(admin_client, authors_map)
+
+    def test_01_review_list(self, client, comments,
+                            django_assert_num_queries):
+        _, reviews, titles = comments
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Версии для ETag вместе с проверкой произведения, COUNT и
+        # страница отзывов с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == len(reviews), (
+            f'Проверьте, что число запросов к БД при получении `{url}` '
+            'не зависит от числа отзывов.'
+        )
+
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        # Пустой список: версии с проверкой произведения и COUNT.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [], (
+            f'Проверьте, что `{url}` возвращает пустой список для '
+            'произведения без отзывов.'
+        )
+
+        response = client.get(f'/api/v1/titles/{titles[-1]["id"] + 1}/'
+                              'reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что список отзывов несуществующего произведения '
+            'возвращает статус 404.'
+        )
+
+    def test_02_comment_list(self, client, comments,
+                             django_assert_num_queries):
+        result, reviews, titles = comments
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        # Версии для ETag вместе с проверкой отзыва, COUNT и страница
+        # комментариев с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()['results']) == len(result), (
+            f'Проверьте, что число запросов к БД при получении `{url}` '
+            'не зависит от числа комментариев.'
+        )
+
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[1]["id"]}/comments/')
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [], (
+            f'Проверьте, что `{url}` возвращает пустой список для '
+            'отзыва без комментариев.'
+        )
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+                              f'{reviews[0]["id"]}/comments/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии к отзыву другого произведения '
+            'возвращают статус 404.'
+        )
+
+    def test_03_review_retrieve(self, client, comments,
+                                django_assert_num_queries):
+        _, reviews, titles = comments
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        # Версии для ETag вместе с проверкой отзыва и отзыв с автором.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['author'] == reviews[0]['author'], (
+            'Проверьте, что автор отзыва загружается тем же запросом, '
+            'что и отзыв.'
+        )
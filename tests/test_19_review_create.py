@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReviewCreate:
+
+    @pytest.fixture
+    def title(self, db):
+        from reviews.models import Title
+
+        return Title.objects.create(name='Произведение', year=2000)
+
+    def test_01_create_queries(self, user_client, user, title,
+                               django_assert_num_queries):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        data = {'text': 'Отзыв', 'score': 7}
+        # Пользователь, проверка произведения, транзакция вставки отзыва
+        # с обновлением рейтинга, созданием столбца гистограммы оценок
+        # и строк таблиц рейтингов; после фиксации - версии отзывов для
+        # ETag одним UPDATE и транзакцией INSERT новых.
+        with django_assert_num_queries(15):
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{url}` создает отзыв.'
+        )
+
+    def test_02_duplicate(self, user_client, user, title):
+        from reviews.models import Review
+
+        Review.objects.create(title=title, author=user, text='Первый',
+                              score=5)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = user_client.post(url, data={'text': 'Второй', 'score': 9})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что повторный отзыв через `{url}` возвращает '
+            'статус 400, а не ошибку сервера.'
+        )
+        assert 'non_field_errors' in response.json()
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum) == (1, 5), (
+            'Проверьте, что отклоненный отзыв не меняет рейтинг '
+            'произведения.'
+        )
+
+    def test_03_missing_title(self, user_client, title):
+        url = f'/api/v1/titles/{title.pk + 1}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 9})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что POST-запрос к `{url}` для несуществующего '
+            'произведения возвращает статус 404.'
+        )
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+def get_distribution(client, title_id):
+    response = client.get(f'/api/v1/titles/{title_id}/score-distribution/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Проверьте, что GET-запрос к '
+        '`/api/v1/titles/{title_id}/score-distribution/` возвращает '
+        'статус 200.'
+    )
+    return response.json()
+
+
+def get_counts(data):
+    return {item['score']: item['count'] for item in data['distribution']
+            if item['count']}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ScoreDistribution:
+
+    def test_01_distribution(self, client, admin_client, user_client,
+                             moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+
+        data = get_distribution(client, title_id)
+        assert data['count'] == 0 and data['mean'] is None, (
+            'Проверьте, что у произведения без отзывов пустое '
+            'распределение оценок.'
+        )
+        assert [item['score'] for item in data['distribution']] == list(
+            range(1, 11)
+        )
+
+        create_single_review(admin_client, title_id, 'Отзыв', 2)
+        create_single_review(user_client, title_id, 'Отзыв', 4)
+        review = create_single_review(moderator_client, title_id, 'Отзыв', 9)
+        data = get_distribution(client, title_id)
+        assert get_counts(data) == {2: 1, 4: 1, 9: 1}, (
+            'Проверьте, что распределение оценок обновляется при создании '
+            'отзывов.'
+        )
+        assert data['count'] == 3
+        assert data['mean'] == 5
+        assert data['median'] == 4
+        assert data['stddev'] == pytest.approx((26 / 3) ** 0.5)
+
+        url = f'/api/v1/titles/{title_id}/reviews/{review.json()["id"]}/'
+        moderator_client.patch(url, data={'score': 4})
+        data = get_distribution(client, title_id)
+        assert get_counts(data) == {2: 1, 4: 2}, (
+            'Проверьте, что распределение оценок обновляется при изменении '
+            'оценки отзыва.'
+        )
+
+        moderator_client.delete(url)
+        data = get_distribution(client, title_id)
+        assert get_counts(data) == {2: 1, 4: 1}, (
+            'Проверьте, что распределение оценок обновляется при удалении '
+            'отзыва.'
+        )
+        assert data['median'] == 3
+
+    def test_02_not_found(self, client):
+        response = client.get('/api/v1/titles/1/score-distribution/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что для несуществующего произведения '
+            '`score-distribution` возвращает статус 404.'
+        )
+
+    def test_03_rebuild_command(self, client, admin_client, user_client):
+        from reviews.models import TitleScore
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 8)
+        TitleScore.objects.all().delete()
+
+        call_command('rebuild_aggregates')
+        assert get_counts(get_distribution(client, title_id)) == {8: 1}, (
+            'Проверьте, что команда `rebuild_aggregates` восстанавливает '
+            'гистограммы оценок.'
+        )
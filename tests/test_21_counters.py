@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Counters:
+
+    @pytest.fixture
+    def comments(self, admin_client, admin, user_client, user,
+                 moderator_client, moderator):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        return create_comments(admin_client, authors_map)
+
+    @staticmethod
+    def get_counts(client, title_id, review_id):
+        title = client.get(f'/api/v1/titles/{title_id}/').json()
+        response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        reviews = {
+            review['id']: review['comment_count']
+            for review in response.json()['results']
+        }
+        return title['review_count'], reviews[review_id]
+
+    def test_01_counters(self, client, comments, moderator_client, user):
+        result, reviews, titles = comments
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        assert self.get_counts(client, title_id, review_id) == (3, 3), (
+            'Проверьте, что произведение показывает `review_count`, '
+            'а отзыв - `comment_count`.'
+        )
+
+        moderator_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            f'{result[0]["id"]}/'
+        )
+        assert self.get_counts(client, title_id, review_id) == (3, 2), (
+            'Проверьте, что `comment_count` уменьшается при удалении '
+            'комментария, в том числе в закэшированном списке отзывов.'
+        )
+
+        user.delete()
+        assert self.get_counts(client, title_id, review_id) == (2, 1), (
+            'Проверьте, что счетчики пересчитываются при каскадном '
+            'удалении отзывов и комментариев вместе с автором.'
+        )
+
+    def test_02_rebuild_command(self, client, comments):
+        from reviews.models import Review, Title
+
+        _, reviews, titles = comments
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        self.get_counts(client, title_id, review_id)
+        Review.objects.update(comment_count=0)
+        Title.objects.update(review_count=0)
+
+        call_command('rebuild_aggregates')
+        assert self.get_counts(client, title_id, review_id) == (3, 3), (
+            'Проверьте, что команда `rebuild_aggregates` исправляет '
+            'расхождения счетчиков отзывов и комментариев.'
+        )
+
+    def test_03_repeated_delete(self, client, comments):
+        from reviews.models import Comment, Review
+
+        result, reviews, titles = comments
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        # Два экземпляра одной строки, как у параллельных DELETE.
+        first, second = (Comment.objects.get(pk=result[0]['id'])
+                         for _ in range(2))
+        first.delete()
+        second.delete()
+        review = Review.objects.get(pk=review_id)
+        assert review.comment_count == review.comments.count(), (
+            'Проверьте, что повторное удаление уже удаленного комментария '
+            'не уменьшает `comment_count`.'
+        )
+
+        first, second = (Review.objects.get(pk=reviews[1]['id'])
+                         for _ in range(2))
+        first.delete()
+        second.delete()
+        assert self.get_counts(client, title_id, review_id)[0] == 2, (
+            'Проверьте, что повторное удаление уже удаленного отзыва '
+            'не уменьшает `review_count`.'
+        )
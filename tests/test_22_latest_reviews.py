@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22LatestReviews:
+    url = '/api/v1/reviews/latest/'
+
+    @pytest.fixture
+    def reviews(self, db, admin, user, moderator):
+        from reviews.models import Review, Title
+
+        titles = [
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+            for idx in range(3)
+        ]
+        for title in titles[:2]:
+            for score, author in enumerate((admin, user, moderator), 1):
+                Review.objects.create(title=title, author=author,
+                                      text=f'Отзыв {score}', score=score)
+        return titles
+
+    def test_01_latest(self, client, reviews, django_assert_num_queries):
+        first, second, empty = reviews
+        with django_assert_num_queries(1):
+            response = client.get(self.url, {
+                'titles': f'{second.pk},{empty.pk},{first.pk}',
+                'per_title': 2,
+            })
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает статус 200 '
+            'одним запросом к БД.'
+        )
+        data = response.json()
+        assert [item['title'] for item in data] == [
+            second.pk, empty.pk, first.pk
+        ], (
+            f'Проверьте, что `{self.url}` возвращает произведения в порядке '
+            'параметра `titles`.'
+        )
+        assert [review['text'] for review in data[0]['reviews']] == [
+            'Отзыв 3', 'Отзыв 2'
+        ], (
+            f'Проверьте, что `{self.url}` возвращает `per_title` последних '
+            'отзывов произведения, начиная с новых.'
+        )
+        assert data[1]['reviews'] == []
+        assert set(data[2]['reviews'][0]) == {
+            'author', 'id', 'pub_date', 'text', 'score', 'comment_count'
+        }, (
+            f'Проверьте, что `{self.url}` отдает отзывы в формате '
+            'ReviewSerializer.'
+        )
+
+    @pytest.mark.parametrize('params', [
+        {},
+        {'titles': 'a,b'},
+        {'titles': '1', 'per_title': 0},
+        {'titles': ','.join(str(idx) for idx in range(1, 102))},
+    ])
+    def test_02_bad_params(self, client, params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{self.url}` проверяет параметры запроса.'
+        )
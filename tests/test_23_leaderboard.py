@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+
+def get_board(client, **params):
+    url = '/api/v1/leaderboard/'
+    response = client.get(url, params)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+    )
+    return [
+        (entry['title'], entry['rating'], entry['review_count'])
+        for entry in response.json()['results']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Leaderboard:
+
+    @pytest.fixture
+    def titles(self, db, admin, user, moderator):
+        from reviews.models import Category, Genre, Review, Title
+
+        films = Category.objects.create(name='Фильм', slug='films')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        titles = [
+            Title.objects.create(name=f'Произведение {idx}', year=2000,
+                                 category=films if idx else None)
+            for idx in range(3)
+        ]
+        titles[0].genre.set([drama])
+        scores = {0: (10,), 1: (8, 6, 7), 2: ()}
+        authors = (admin, user, moderator)
+        for idx, title_scores in scores.items():
+            for author, score in zip(authors, title_scores):
+                Review.objects.create(title=titles[idx], author=author,
+                                      text='Отзыв', score=score)
+        return titles
+
+    def test_01_boards(self, client, titles):
+        first, second, _ = titles
+        assert get_board(client) == [
+            (first.pk, 10, 1), (second.pk, 7, 3)
+        ], (
+            'Проверьте, что общий рейтинг содержит произведения с отзывами '
+            'по убыванию оценки.'
+        )
+        assert get_board(client, order='reviews') == [
+            (second.pk, 7, 3), (first.pk, 10, 1)
+        ], (
+            'Проверьте, что `order=reviews` сортирует по числу отзывов.'
+        )
+        assert get_board(client, min_reviews=2) == [(second.pk, 7, 3)], (
+            'Проверьте, что `min_reviews` отсекает произведения с малым '
+            'числом отзывов.'
+        )
+        assert get_board(client, category='films') == [(second.pk, 7, 3)]
+        assert get_board(client, genre='drama') == [(first.pk, 10, 1)]
+        assert get_board(client, genre='comedy') == []
+
+    def test_02_incremental(self, client, titles, admin):
+        from reviews.models import Genre, Review
+
+        first, second, third = titles
+        Review.objects.create(title=third, author=admin, text='Отзыв',
+                              score=9)
+        Review.objects.filter(title=first).get().delete()
+        second.genre.add(Genre.objects.get(slug='comedy'))
+        third.category = None
+        third.save()
+        assert get_board(client) == [(third.pk, 9, 1), (second.pk, 7, 3)], (
+            'Проверьте, что рейтинги обновляются при создании и удалении '
+            'отзывов.'
+        )
+        assert get_board(client, genre='comedy') == [(second.pk, 7, 3)], (
+            'Проверьте, что рейтинги жанров обновляются при изменении '
+            'жанров произведения.'
+        )
+        assert get_board(client, category='films') == [(second.pk, 7, 3)], (
+            'Проверьте, что рейтинги категорий обновляются при изменении '
+            'категории произведения.'
+        )
+
+    def test_03_rebuild_command(self, client, titles):
+        from reviews.models import LeaderboardEntry
+
+        first, second, _ = titles
+        LeaderboardEntry.objects.all().delete()
+        call_command('rebuild_leaderboards')
+        assert get_board(client) == [(first.pk, 10, 1), (second.pk, 7, 3)], (
+            'Проверьте, что команда `rebuild_leaderboards` пересобирает '
+            'рейтинги.'
+        )
+        assert get_board(client, genre='drama') == [(first.pk, 10, 1)]
+
+    def test_04_queries(self, client, titles, django_assert_num_queries):
+        # Версии для ключа кэша ответов и страница рейтинга.
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/leaderboard/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что страница рейтинга получается одним запросом '
+            'к БД без COUNT.'
+        )
+        response = client.get('/api/v1/leaderboard/',
+                              {'category': 'films', 'genre': 'drama'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from tests.utils import create_comments
+
+
+def read_stream(response):
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдается потоком (StreamingHttpResponse).'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Export:
+
+    @pytest.fixture
+    def comments(self, admin_client, admin, user_client, user,
+                 moderator_client, moderator):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        return create_comments(admin_client, authors_map)
+
+    def test_01_ndjson(self, admin_client, comments):
+        result, reviews, _ = comments
+        url = '/api/v1/export/reviews/'
+        lines = read_stream(admin_client.get(url)).splitlines()
+        exported = [json.loads(line) for line in lines]
+        assert [row['id'] for row in exported] == [
+            review['id'] for review in reviews
+        ], (
+            f'Проверьте, что `{url}` выгружает все отзывы в порядке '
+            'публикации по строке NDJSON на отзыв.'
+        )
+        assert exported[0]['author'] == reviews[0]['author']
+        assert exported[0]['comment_count'] == len(result)
+
+    def test_02_csv(self, admin_client, comments):
+        result, reviews, titles = comments
+        url = '/api/v1/export/comments/'
+        response = admin_client.get(url, {'output': 'csv'})
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(read_stream(response))))
+        assert [int(row['id']) for row in rows] == [
+            comment['id'] for comment in result
+        ], (
+            f'Проверьте, что `{url}?output=csv` выгружает все комментарии '
+            'в CSV с заголовком.'
+        )
+        assert int(rows[0]['review_id']) == reviews[0]['id']
+        assert int(rows[0]['title_id']) == titles[0]['id']
+
+    def test_03_date_range(self, admin_client, comments):
+        from reviews.models import Review
+
+        _, reviews, _ = comments
+        now = timezone.now()
+        Review.objects.filter(pk=reviews[0]['id']).update(
+            pub_date=now - timedelta(days=2))
+        url = '/api/v1/export/reviews/'
+        lines = read_stream(admin_client.get(url, {
+            'since': (now - timedelta(days=1)).isoformat(),
+        })).splitlines()
+        assert {json.loads(line)['id'] for line in lines} == {
+            review['id'] for review in reviews[1:]
+        }, (
+            f'Проверьте, что `{url}` фильтрует отзывы по `since`.'
+        )
+        lines = read_stream(admin_client.get(url, {
+            'until': (now - timedelta(days=1)).isoformat(),
+        })).splitlines()
+        assert [json.loads(line)['id'] for line in lines] == [
+            reviews[0]['id']
+        ], (
+            f'Проверьте, что `{url}` фильтрует отзывы по `until`.'
+        )
+        response = admin_client.get(url, {'since': 'вчера'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_permissions(self, client, user_client):
+        url = '/api/v1/export/reviews/'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{url}` доступен только администратору.'
+        )
+
+    def test_05_command(self, comments, tmp_path):
+        result, _, _ = comments
+        out = io.StringIO()
+        call_command('export_data', 'comments', stdout=out)
+        assert len(out.getvalue().splitlines()) == len(result), (
+            'Проверьте, что команда `export_data` выгружает комментарии.'
+        )
+        path = tmp_path / 'reviews.csv'
+        call_command('export_data', 'reviews', '--output', 'csv',
+                     '--file', str(path))
+        with open(path, encoding='utf-8') as file:
+            assert len(list(csv.DictReader(file))) == 3
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25UserCache:
+    url = '/api/v1/users/me/'
+
+    def test_01_cached_user(self, user_client, user,
+                            django_assert_num_queries):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        with django_assert_num_queries(0):
+            response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос с тем же JWT не читает '
+            'пользователя из БД.'
+        )
+        assert response.json()['username'] == user.username
+
+    def test_02_role_change(self, admin_client, user_client, user):
+        users_url = '/api/v1/users/'
+        assert user_client.get(users_url).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.patch(f'{users_url}{user.username}/',
+                                      data={'role': 'admin'})
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(users_url).status_code == HTTPStatus.OK, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя: '
+            'права проверяются по новой роли.'
+        )
+
+    def test_03_me_change(self, user_client, user):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        response = user_client.patch(self.url, data={'bio': 'Новое'})
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.url).json()['bio'] == 'Новое', (
+            f'Проверьте, что PATCH-запрос к `{self.url}` сбрасывает кэш '
+            'пользователя.'
+        )
+
+    def test_04_deactivated(self, user_client, user):
+        assert user_client.get(self.url).status_code == HTTPStatus.OK
+        user.is_active = False
+        user.save()
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что деактивированный пользователь не проходит '
+            'аутентификацию по закэшированной записи.'
+        )
+
+    def test_05_other_process_change(self, user_client, user,
+                                     django_user_model):
+        from api.authentication import bump_user_version
+
+        users_url = '/api/v1/users/'
+        assert user_client.get(users_url).status_code == HTTPStatus.FORBIDDEN
+        # Изменение в другом процессе с общим кэшем Django: строка в БД
+        # и версия в общем кэше меняются, а кэш пользователей этого
+        # процесса не трогается.
+        django_user_model.objects.filter(pk=user.pk).update(role='admin')
+        bump_user_version(user.pk)
+        assert user_client.get(users_url).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение пользователя в другом процессе '
+            'сбрасывает его запись в кэше этого процесса.'
+        )
+
+    def test_06_shared_cache_check(self, monkeypatch):
+        from types import SimpleNamespace
+
+        from api import checks
+
+        def backend(path):
+            # Настройки подменяются в модуле проверки: смена CACHES
+            # пересоздала бы кэши всех тестов.
+            monkeypatch.setattr(checks, 'settings', SimpleNamespace(
+                CACHES={'default': {'BACKEND': path}}))
+
+        backend('django.core.cache.backends.locmem.LocMemCache')
+        assert [error.id for error in checks.check_shared_cache(None)] == [
+            'api.E001'
+        ], (
+            'Проверьте, что проверка развертывания требует общего для '
+            'процессов кэша.'
+        )
+        backend('django.core.cache.backends.memcached.PyMemcacheCache')
+        assert checks.check_shared_cache(None) == []
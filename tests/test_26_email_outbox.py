@@ -0,0 +1,134 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class FailingBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который не может отправить ни одного письма."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_enqueues_email(self, client):
+        from users.models import OutgoingEmail
+
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что `{self.url_signup}` не отправляет письмо '
+            'во время запроса, а ставит его в очередь.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == data['email'] and email.sent is None
+
+        call_command('send_emails', '--once')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [data['email']]
+        email.refresh_from_db()
+        assert email.sent is not None and email.next_attempt is None, (
+            'Проверьте, что отправленное письмо помечается в очереди и '
+            'больше не отправляется.'
+        )
+        assert email.body == '', (
+            'Проверьте, что у отправленного письма стирается текст с кодом '
+            'подтверждения.'
+        )
+        call_command('send_emails', '--once')
+        assert len(mail.outbox) == outbox_before_count + 1
+
+    def test_02_batch_delivery(self):
+        from users.outbox import deliver_pending, enqueue_email
+
+        outbox_before_count = len(mail.outbox)
+        for idx in range(5):
+            enqueue_email('Тема', 'Текст', f'user{idx}@yamdb.fake')
+        assert deliver_pending(batch_size=3) == (3, 0)
+        assert deliver_pending(batch_size=3) == (2, 0)
+        assert deliver_pending(batch_size=3) == (0, 0)
+        assert len(mail.outbox) == outbox_before_count + 5
+
+    def test_03_retry_with_backoff(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_pending, enqueue_email
+
+        settings.EMAIL_BACKEND = f'{__name__}.FailingBackend'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        email = enqueue_email('Тема', 'Текст', 'retry@yamdb.fake')
+
+        started = timezone.now()
+        assert deliver_pending() == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 1 and 'SMTP' in email.last_error
+        assert email.next_attempt >= started + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY), (
+            'Проверьте, что неудачное письмо откладывается на паузу '
+            'EMAIL_OUTBOX_RETRY_DELAY.'
+        )
+        assert deliver_pending() == (0, 0), (
+            'Проверьте, что письмо не отправляется повторно до окончания '
+            'паузы.'
+        )
+
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        assert deliver_pending() == (0, 1)
+        email.refresh_from_db()
+        assert email.attempts == 2 and email.next_attempt is None, (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо '
+            'больше не отправляется.'
+        )
+        assert email.sent is None
+        assert email.body == '', (
+            'Проверьте, что у отброшенного письма стирается текст.'
+        )
+
+    def test_04_retry_succeeds(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_pending, enqueue_email
+
+        outbox_before_count = len(mail.outbox)
+        settings.EMAIL_BACKEND = f'{__name__}.FailingBackend'
+        email = enqueue_email('Тема', 'Текст', 'later@yamdb.fake')
+        assert deliver_pending() == (0, 1)
+
+        settings.EMAIL_BACKEND = LOCMEM_BACKEND
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        assert deliver_pending() == (1, 0)
+        email.refresh_from_db()
+        assert email.sent is not None and email.attempts == 1
+        assert len(mail.outbox) == outbox_before_count + 1
+
+    def test_05_purge(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_pending, enqueue_email
+
+        settings.EMAIL_BACKEND = f'{__name__}.FailingBackend'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 1
+        enqueue_email('Тема', 'Текст', 'failed@yamdb.fake')
+        assert deliver_pending() == (0, 1)
+        settings.EMAIL_BACKEND = LOCMEM_BACKEND
+        enqueue_email('Тема', 'Текст', 'sent@yamdb.fake')
+        assert deliver_pending() == (1, 0)
+        pending = enqueue_email('Тема', 'Текст', 'pending@yamdb.fake')
+        OutgoingEmail.objects.update(
+            created=timezone.now() - timedelta(
+                seconds=settings.EMAIL_OUTBOX_RETENTION + 1))
+
+        call_command('send_emails', '--once')
+        assert list(OutgoingEmail.objects.all()) == [pending], (
+            'Проверьте, что `send_emails` удаляет старые отправленные и '
+            'отброшенные письма, но не письма в очереди.'
+        )
@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError, connection
+from django.test import Client
+
+THREADS = 8
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27RegistrationUpsert:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def no_throttling(self, settings):
+        # Все запросы идут с одного IP: ограничение частоты проверяет
+        # tests/test_28_throttling.py.
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}}
+
+    def signup_in_threads(self, payloads):
+        def signup(data):
+            # Тестовая БД SQLite в памяти блокирует таблицу целиком, а не
+            # ждет освобождения: такой запрос откатывается и повторяется.
+            try:
+                while True:
+                    try:
+                        return Client().post(
+                            self.url_signup, data=data).status_code
+                    except OperationalError as error:
+                        if 'locked' not in str(error):
+                            raise
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            return list(executor.map(signup, payloads))
+
+    def test_01_signup_queries(self, client, django_user_model,
+                               django_assert_num_queries):
+        data = {'email': 'upsert@yamdb.fake', 'username': 'upsert'}
+        # Транзакция, поиск по username или email, вставка пользователя
+        # (с точкой сохранения) и письма.
+        with django_assert_num_queries(6):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+
+        # Повторный запрос кода: только поиск и письмо.
+        with django_assert_num_queries(3):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторная регистрация с теми же данными '
+            'возвращает статус 200.'
+        )
+        assert django_user_model.objects.filter(
+            username=data['username']).count() == 1
+
+    def test_02_conflicts(self, client, django_user_model):
+        django_user_model.objects.create(
+            username='first', email='first@yamdb.fake')
+        django_user_model.objects.create(
+            username='second', email='second@yamdb.fake')
+        cases = (
+            ({'username': 'other', 'email': 'first@yamdb.fake'}, 'email'),
+            ({'username': 'first', 'email': 'other@yamdb.fake'}, 'username'),
+            ({'username': 'second', 'email': 'first@yamdb.fake'}, 'email'),
+        )
+        for data, field in cases:
+            response = client.post(self.url_signup, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что регистрация с занятым `{field}` возвращает '
+                'статус 400.'
+            )
+            assert f'таким {field}' in response.json()[0]
+        assert django_user_model.objects.count() == 2
+
+    def test_03_concurrent_same_user(self, django_user_model):
+        data = {'email': 'race@yamdb.fake', 'username': 'race'}
+        statuses = self.signup_in_threads([data] * THREADS * 2)
+        assert statuses == [HTTPStatus.OK] * THREADS * 2, (
+            'Проверьте, что одновременные регистрации с одинаковыми '
+            'данными завершаются успешно.'
+        )
+        assert django_user_model.objects.filter(
+            email=data['email']).count() == 1
+
+    def test_04_concurrent_same_email(self, django_user_model):
+        payloads = [
+            {'email': 'race@yamdb.fake', 'username': f'race{idx}'}
+            for idx in range(THREADS * 2)
+        ]
+        statuses = self.signup_in_threads(payloads)
+        assert statuses.count(HTTPStatus.OK) == 1, (
+            'Проверьте, что из одновременных регистраций с одним `email` '
+            'успешна только одна.'
+        )
+        assert statuses.count(HTTPStatus.BAD_REQUEST) == len(payloads) - 1
+        assert django_user_model.objects.filter(
+            email='race@yamdb.fake').count() == 1
@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+
+RATES = {'signup': '3/min', 'token': '3/min', 'reviews': '2/min',
+         'comments': '2/min'}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Throttling:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.fixture(autouse=True)
+    def rates(self, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES}
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        from api.throttling import TokenBucketThrottle
+
+        now = [1_000_000.0]
+        monkeypatch.setattr(TokenBucketThrottle, 'timer',
+                            staticmethod(lambda: now[0]))
+        return now
+
+    def test_01_signup(self, client, clock, django_assert_num_queries):
+        data = {'username': 'me', 'email': 'me@yamdb.fake'}
+        for _ in range(3):
+            response = client.post(self.url_signup, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        with django_assert_num_queries(0):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота запросов к `{self.url_signup}` '
+            'ограничена.'
+        )
+        assert response['Retry-After'] == '20', (
+            'Проверьте, что заголовок Retry-After сообщает, через сколько '
+            'секунд появится следующий жетон.'
+        )
+
+        response = client.post(self.url_signup, data=data,
+                               REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что ограничение считается отдельно для каждого IP.'
+        )
+        response = client.post(self.url_token, data={})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{self.url_token}` ограничивается отдельно от '
+            f'`{self.url_signup}`.'
+        )
+
+        clock[0] += 19
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert response['Retry-After'] == '1'
+        clock[0] += 1
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что жетоны пополняются со временем.'
+        )
+
+    def test_02_token(self, client, clock):
+        for _ in range(3):
+            response = client.post(self.url_token, data={})
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.url_token, data={})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что частота запросов к `{self.url_token}` '
+            'ограничена.'
+        )
+
+    def test_03_reviews(self, admin_client, user_client, clock,
+                        django_assert_num_queries):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        titles = [Title.objects.create(name=f'Произведение {idx}',
+                                       year=2000, category=category)
+                  for idx in range(4)]
+        urls = [f'/api/v1/titles/{title.id}/reviews/' for title in titles]
+        data = {'text': 'Текст', 'score': 5}
+        for url in urls[:2]:
+            response = user_client.post(url, data=data)
+            assert response.status_code == HTTPStatus.CREATED
+        with django_assert_num_queries(0):
+            response = user_client.post(urls[2], data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частота создания отзывов ограничена.'
+        )
+        assert response['Retry-After'] == '30'
+
+        response = user_client.get(urls[0])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ограничение не действует на чтение отзывов.'
+        )
+        response = admin_client.post(urls[2], data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что ограничение считается отдельно для каждого '
+            'пользователя.'
+        )
+
+        review = titles[0].reviews.get()
+        url = f'{urls[0]}{review.id}/comments/'
+        for _ in range(2):
+            response = user_client.post(url, data={'text': 'Комментарий'})
+            assert response.status_code == HTTPStatus.CREATED
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что частота создания комментариев ограничена.'
+        )
+
+    def test_04_concurrent_burst(self, monkeypatch):
+        import threading
+        import time
+
+        from django.core.cache import cache
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        from api.throttling import SignupThrottle
+
+        class SlowCache:
+            """Кэш, расширяющий окно между чтением и записью корзины."""
+
+            def __getattr__(self, name):
+                return getattr(cache, name)
+
+            def get(self, *args, **kwargs):
+                value = cache.get(*args, **kwargs)
+                time.sleep(0.01)
+                return value
+
+        monkeypatch.setattr(SignupThrottle, 'cache', SlowCache())
+        request = Request(APIRequestFactory().post(self.url_signup))
+        results = []
+
+        def check():
+            results.append(SignupThrottle().allow_request(request, None))
+
+        threads = [threading.Thread(target=check) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 3, (
+            'Проверьте, что параллельные запросы не расходуют один и тот же '
+            'жетон корзины.'
+        )
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+
+URL = '/api/v1/users/'
+
+
+@pytest.fixture
+def users(django_user_model):
+    names = ('Alice', 'alina', 'ALBERT', 'bob', 'Ёжик', 'al_x')
+    return [
+        django_user_model.objects.create(
+            username=name, email=f'user{idx}@yamdb.fake')
+        for idx, name in enumerate(names)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29UserSearch:
+
+    def test_01_prefix(self, admin_client, users):
+        response = admin_client.get(f'{URL}?username=AL')
+        assert response.status_code == HTTPStatus.OK
+        usernames = [user['username'] for user in response.json()['results']]
+        assert usernames == ['alina', 'Alice', 'ALBERT', 'al_x'], (
+            'Проверьте, что `?username=` ищет пользователей по началу '
+            'username без учета регистра.'
+        )
+
+        response = admin_client.get(f'{URL}?username=ёж')
+        assert [user['username'] for user in response.json()['results']] == [
+            'Ёжик'
+        ]
+        response = admin_client.get(f'{URL}?username=al_')
+        assert [user['username'] for user in response.json()['results']] == [
+            'al_x'
+        ]
+
+        response = admin_client.get(f'{URL}?username=al&cursor=')
+        results = response.json()['results']
+        assert [user['username'] for user in results] == usernames, (
+            'Проверьте, что курсорная страница поиска по префиксу '
+            'сохраняет порядок.'
+        )
+
+    def test_02_email(self, admin_client, users):
+        response = admin_client.get(f'{URL}?email=user3@yamdb.fake')
+        assert response.status_code == HTTPStatus.OK
+        assert [user['username'] for user in response.json()['results']] == [
+            'bob'
+        ], 'Проверьте, что `?email=` возвращает пользователя с этим email.'
+
+    def test_03_username_lower(self, admin_client, users,
+                               django_user_model):
+        response = admin_client.patch(f'{URL}bob/',
+                                      data={'username': 'Bobby'})
+        assert response.status_code == HTTPStatus.OK
+        assert django_user_model.objects.get(
+            username='Bobby').username_lower == 'bobby'
+        response = admin_client.get(f'{URL}?username=bobb')
+        assert [user['username'] for user in response.json()['results']] == [
+            'Bobby'
+        ], 'Проверьте, что поиск учитывает изменение username.'
+
+    def test_04_query_plan(self, django_user_model):
+        from django.db import connection
+
+        from api.filters import UserFilter
+
+        if connection.vendor != 'sqlite':
+            pytest.skip('План запроса проверяется только для SQLite.')
+        queryset = UserFilter(
+            {'username': 'al'}, queryset=django_user_model.objects.all()).qs
+        plan = queryset.explain()
+        assert 'user_username_lower_idx' in plan, (
+            'Проверьте, что поиск по префиксу использует индекс '
+            'username_lower.'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что результаты поиска по префиксу не сортируются '
+            'отдельно.'
+        )
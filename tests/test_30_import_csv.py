@@ -0,0 +1,231 @@
+import csv
+import shutil
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'api_yamdb/static/data'
+
+
+def csv_rows(name, directory=DATA_DIR):
+    with open(directory / name, encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ImportCSV:
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        for path in DATA_DIR.glob('*.csv'):
+            shutil.copy(path, tmp_path)
+        return tmp_path
+
+    def test_01_import(self):
+        from django.db.models import Sum
+
+        from api.importing import MODELS_CSV
+        from reviews.models import Review, Title, TitleScore
+        from users.models import User
+
+        out = StringIO()
+        call_command('import_data_csv', '--batch-size', '7', stdout=out)
+        for model, csv_file in MODELS_CSV.items():
+            assert model.objects.count() == csv_rows(csv_file), (
+                f'Проверьте, что из `{csv_file}` импортированы все строки.'
+            )
+            assert f'Данные из файла {csv_file}' in out.getvalue()
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что импорт сообщает скорость для каждого файла.'
+        )
+
+        assert all(user.username_lower == user.username.lower()
+                   for user in User.objects.all())
+        for title in Title.objects.all():
+            reviews = Review.objects.filter(title=title)
+            assert title.review_count == reviews.count(), (
+                'Проверьте, что после импорта пересчитаны счетчики отзывов '
+                'произведений.'
+            )
+            assert title.score_sum == (
+                reviews.aggregate(total=Sum('score'))['total'] or 0)
+        assert TitleScore.objects.aggregate(
+            total=Sum('count'))['total'] == Review.objects.count()
+        for review in Review.objects.all():
+            assert review.comment_count == review.comments.count()
+
+        user = User.objects.create(username='after_import',
+                                   email='after_import@yamdb.fake')
+        assert user.pk > max(User.objects.exclude(pk=user.pk).values_list(
+            'pk', flat=True))
+
+    def test_02_failed_batch(self, data_dir):
+        from reviews.models import Comment, ImportCheckpoint, Review
+
+        with open(data_dir / 'comments.csv', 'a', encoding='utf-8') as file:
+            file.write('\n999,999999,Комментарий,100,2020-01-13T23:20:02Z')
+
+        with pytest.raises(IntegrityError):
+            call_command('import_data_csv', '--path', str(data_dir),
+                         '--batch-size', '1', stdout=StringIO())
+        assert Review.objects.count() == csv_rows('review.csv'), (
+            'Проверьте, что файлы до ошибочного остаются импортированными.'
+        )
+        assert Comment.objects.count() == csv_rows('comments.csv'), (
+            'Проверьте, что порции до ошибочной остаются импортированными.'
+        )
+        checkpoint = ImportCheckpoint.objects.get(file='comments.csv')
+        assert checkpoint.rows == csv_rows('comments.csv')
+        assert not checkpoint.done
+
+    def test_03_dependency_order(self):
+        from api.importing import MODELS_CSV, dependency_order
+
+        models = dependency_order(list(MODELS_CSV))
+        assert set(models) == set(MODELS_CSV)
+        for model in models:
+            for field in model._meta.concrete_fields:
+                if field.is_relation and field.related_model in MODELS_CSV:
+                    assert (models.index(field.related_model)
+                            < models.index(model)), (
+                        f'Проверьте, что {field.related_model.__name__} '
+                        f'импортируется раньше {model.__name__}.'
+                    )
+
+    def test_04_parallel(self):
+        from api.importing import MODELS_CSV
+
+        call_command('import_data_csv', '--workers', '3', '--batch-size',
+                     '10', stdout=StringIO())
+        for model, csv_file in MODELS_CSV.items():
+            assert model.objects.count() == csv_rows(csv_file), (
+                'Проверьте, что импорт с пулом процессов импортирует все '
+                'строки.'
+            )
+
+    def test_05_invalid_row(self, data_dir):
+        from reviews.models import Review
+
+        with open(data_dir / 'review.csv', 'a', encoding='utf-8') as file:
+            file.write('\n999,1,Текст,100,десять,2020-01-13T23:20:02Z')
+        with pytest.raises(CommandError) as error:
+            call_command('import_data_csv', '--path', str(data_dir),
+                         stdout=StringIO())
+        number = csv_rows('review.csv') + 1
+        assert f'review.csv, запись {number}' in str(error.value), (
+            'Проверьте, что ошибка разбора сообщает файл и номер записи.'
+        )
+        assert not Review.objects.exists(), (
+            'Проверьте, что порция с ошибкой не импортируется.'
+        )
+
+    def test_06_resume(self, data_dir):
+        from api.importing import MODELS_CSV
+        from reviews.models import ImportCheckpoint, Review, Title
+
+        path = data_dir / 'review.csv'
+        content = path.read_text(encoding='utf-8')
+        path.write_text(
+            content + '\n999,1,Текст,104,десять,2020-01-13T23:20:02Z',
+            encoding='utf-8')
+        with pytest.raises(CommandError):
+            call_command('import_data_csv', '--path', str(data_dir),
+                         '--batch-size', '10', stdout=StringIO())
+        committed = csv_rows('review.csv') // 10 * 10
+        assert Review.objects.count() == committed, (
+            'Проверьте, что зафиксированные порции остаются в БД.'
+        )
+        checkpoint = ImportCheckpoint.objects.get(file='review.csv')
+        assert checkpoint.rows == committed
+        assert 0 < checkpoint.offset < path.stat().st_size
+
+        path.write_text(
+            content + '\n999,1,Текст,104,10,2020-01-13T23:20:02Z',
+            encoding='utf-8')
+        out = StringIO()
+        call_command('import_data_csv', '--path', str(data_dir),
+                     '--batch-size', '10', '--resume', stdout=out)
+        assert 'users.csv' not in out.getvalue(), (
+            'Проверьте, что --resume не импортирует завершенные файлы '
+            'заново.'
+        )
+        assert Review.objects.count() == csv_rows('review.csv', data_dir), (
+            'Проверьте, что --resume продолжает импорт с последней '
+            'зафиксированной порции.'
+        )
+        for model, csv_file in MODELS_CSV.items():
+            assert model.objects.count() == csv_rows(csv_file, data_dir)
+        assert all(checkpoint.done
+                   for checkpoint in ImportCheckpoint.objects.all())
+        title = Title.objects.get(pk=1)
+        assert title.review_count == title.reviews.count()
+
+    def test_07_on_conflict(self, data_dir):
+        from api.importing import MODELS_CSV
+        from reviews.models import Title
+
+        call_command('import_data_csv', '--path', str(data_dir),
+                     stdout=StringIO())
+        with pytest.raises(IntegrityError):
+            call_command('import_data_csv', '--path', str(data_dir),
+                         stdout=StringIO())
+
+        call_command('import_data_csv', '--path', str(data_dir),
+                     '--on-conflict', 'skip', stdout=StringIO())
+        for model, csv_file in MODELS_CSV.items():
+            assert model.objects.count() == csv_rows(csv_file), (
+                'Проверьте, что повторный импорт с --on-conflict=skip не '
+                'создает дубликатов.'
+            )
+
+        path = data_dir / 'titles.csv'
+        title = Title.objects.get(pk=1)
+        path.write_text(path.read_text(encoding='utf-8').replace(
+            title.name, 'Новое название', 1), encoding='utf-8')
+        call_command('import_data_csv', '--path', str(data_dir),
+                     '--on-conflict', 'update', stdout=StringIO())
+        assert Title.objects.get(pk=1).name == 'Новое название', (
+            'Проверьте, что --on-conflict=update обновляет существующие '
+            'строки.'
+        )
+        assert Title.objects.count() == csv_rows('titles.csv')
+
+    def test_08_indexes_dropped(self, data_dir):
+        from api.importing import (MODELS_CSV, existing_indexes, find_index,
+                                   import_files, secondary_indexes)
+
+        def missing_indexes():
+            missing = []
+            for model in MODELS_CSV:
+                existing = existing_indexes(model)
+                missing += [
+                    (model, columns) for columns, index
+                    in secondary_indexes(model)
+                    if find_index(existing, columns, index) is None
+                ]
+            return missing
+
+        expected = [
+            (model, columns) for model in MODELS_CSV
+            for columns, _ in secondary_indexes(model)
+        ]
+        during = []
+        import_files(data_dir, batch_size=5, workers=0,
+                     report=lambda *args: during.append(missing_indexes()))
+        assert all(missing == expected for missing in during), (
+            'Проверьте, что вторичные индексы удаляются на время импорта.'
+        )
+        assert missing_indexes() == [], (
+            'Проверьте, что после импорта вторичные индексы созданы заново.'
+        )
+
+        with pytest.raises(IntegrityError):
+            import_files(data_dir, batch_size=5, workers=0,
+                         report=lambda *args: None)
+        assert missing_indexes() == [], (
+            'Проверьте, что индексы создаются заново и после ошибки импорта.'
+        )